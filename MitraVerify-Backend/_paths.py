@@ -0,0 +1,16 @@
+"""
+Shared setup for the MitraVerify test scripts
+"""
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+SRC_DIR = PROJECT_ROOT / "src"
+
+
+def ensure_src_on_path(include_project_root: bool = False):
+    """Put src (and optionally the project root) at the front of sys.path, skipping entries already there"""
+    paths = [str(SRC_DIR)]
+    if include_project_root:
+        paths.append(str(PROJECT_ROOT))
+    sys.path[:0] = [path for path in paths if path not in sys.path]
@@ -1,40 +1,187 @@
 """
 Logging configuration for MitraVerify
 """
+import atexit
 import logging
+import os
+import queue
+import stat
 import sys
+import threading
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
-from .settings import settings
+# Records buffered in memory before being written to the log file
+LOG_BUFFER_CAPACITY = 512
+# Seconds between forced flushes of the file buffer
+LOG_FLUSH_INTERVAL = 30.0
+# Size of the log file write buffer and rotation limits
+LOG_FILE_BUFFER_SIZE = 1 << 16
+LOG_FILE_MAX_BYTES = 10 << 20
+LOG_FILE_BACKUP_COUNT = 10
+
+_listener = None
+_stop_event = None
+_queue_handler = None
+# (memory handler, stream handler, file handler) of the configured pipeline
+_handlers = None
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that writes through a large buffer instead of flushing per record"""
+
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=LOG_FILE_BUFFER_SIZE,
+                      encoding=self.encoding, errors=self.errors)
+        # Stat once per opened file; emit keeps the size current from then on
+        file_stat = os.fstat(stream.fileno())
+        self._is_regular_file = stat.S_ISREG(file_stat.st_mode)
+        self._bytes_written = file_stat.st_size
+        return stream
+
+    def shouldRollover(self, record):
+        """
+        Decide rollover from the running byte count
+
+        The base class stats the path and seeks the stream for every record,
+        and the seek flushes the write buffer.
+        """
+        if self.stream is None:
+            self.stream = self._open()
+        # Size in encoded bytes; non-ASCII text (e.g. Devanagari) takes several per character
+        self._record_size = len((self.format(record) + self.terminator).encode(self.encoding or "utf-8", "replace"))
+        if self.maxBytes <= 0 or not self._is_regular_file:
+            return False
+        return self._bytes_written + self._record_size >= self.maxBytes
+
+    def emit(self, record):
+        self._record_size = 0
+        super().emit(record)
+        self._bytes_written += self._record_size
+        if record.levelno >= logging.ERROR:
+            self.flush_buffer()
+
+    def flush(self):
+        """Skip the flush StreamHandler.emit issues after every record"""
+
+    def flush_buffer(self):
+        """Write buffered records through to the log file"""
+        super().flush()
+
+
+def _start_flush_timer(handler: MemoryHandler, file_handler: BufferedRotatingFileHandler,
+                       stop_event: threading.Event):
+    """Periodically flush buffered records so the log file never lags far behind"""
+    def _flush_loop():
+        while not stop_event.wait(LOG_FLUSH_INTERVAL):
+            handler.flush()
+            file_handler.flush_buffer()
+
+    thread = threading.Thread(target=_flush_loop, name="log-flush", daemon=True)
+    thread.start()
+
+
+def _start_background_threads():
+    """Start the queue listener and the flush timer for the current process"""
+    global _listener, _stop_event
+
+    memory_handler, stream_handler, file_handler = _handlers
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, memory_handler, stream_handler)
+    _listener.start()
+
+    _stop_event = threading.Event()
+    _start_flush_timer(memory_handler, file_handler, _stop_event)
+
+
+def _flush_before_fork():
+    """Write out buffered records so a forked child does not inherit and repeat them"""
+    if _handlers is not None:
+        memory_handler, _, file_handler = _handlers
+        memory_handler.flush()
+        file_handler.flush_buffer()
+
+
+def _restart_after_fork():
+    """Threads do not survive fork (e.g. gunicorn --preload), so restart them in the child"""
+    if _handlers is not None:
+        _start_background_threads()
+
+
+def _shutdown_logging():
+    """Drain the queue and flush buffered records on interpreter exit"""
+    if _listener is None:
+        return
+    memory_handler, _, file_handler = _handlers
+    _stop_event.set()
+    _listener.stop()
+    memory_handler.flush()
+    memory_handler.close()
+    file_handler.close()
 
 
 def setup_logging():
     """Configure logging for the application"""
+    global _queue_handler, _handlers
+
+    logger = logging.getLogger(__name__)
+    if _listener is not None:
+        return logger
+
+    from .settings import settings
 
     # Create logs directory if it doesn't exist
     log_dir = Path(settings.log_file).parent
-    log_dir.mkdir(exist_ok=True)
+    try:
+        os.mkdir(log_dir)
+    except FileExistsError:
+        pass
 
-    # Configure root logger
-    logging.basicConfig(
-        level=getattr(logging, settings.log_level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler(settings.log_file)
-        ]
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    # Buffer file writes; errors are flushed immediately
+    file_handler = BufferedRotatingFileHandler(
+        settings.log_file,
+        maxBytes=LOG_FILE_MAX_BYTES,
+        backupCount=LOG_FILE_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    file_handler.setFormatter(formatter)
+    memory_handler = MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler
     )
 
+    # Request handlers only enqueue records; a background thread does the I/O
+    _queue_handler = QueueHandler(queue.SimpleQueue())
+    _handlers = (memory_handler, stream_handler, file_handler)
+    _start_background_threads()
+    os.register_at_fork(before=_flush_before_fork, after_in_child=_restart_after_fork)
+    atexit.register(_shutdown_logging)
+
+    # Configure root logger
+    root_logger = logging.getLogger()
+    root_logger.setLevel(getattr(logging, settings.log_level.upper()))
+    root_logger.addHandler(_queue_handler)
+
     # Reduce verbosity of some libraries
     logging.getLogger("transformers").setLevel(logging.WARNING)
     logging.getLogger("torch").setLevel(logging.WARNING)
     logging.getLogger("PIL").setLevel(logging.WARNING)
 
-    logger = logging.getLogger(__name__)
     logger.info("Logging configured successfully")
 
     return logger
 
 
-# Global logger instance
-logger = setup_logging()
\ No newline at end of file
+def __getattr__(name):
+    """Configure logging on first access to the global logger"""
+    if name == "logger":
+        globals()["logger"] = setup_logging()
+        return globals()["logger"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,6 +2,7 @@
 Configuration settings for MitraVerify
 """
 import os
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
 
@@ -12,11 +13,23 @@ class Settings(BaseSettings):
     # API Configuration
     api_host: str = "0.0.0.0"
     api_port: int = 8000
+    api_workers: int = 1
+
+    # Load models at import so forked workers share them (e.g. gunicorn --preload)
+    preload_models: bool = False
+    # Torch intra-op threads per worker process (0 keeps the torch default)
+    torch_num_threads: int = 0
 
     # Model Configuration
     text_model_name: str = "google/muril-base-cased"
     image_model_name: str = "openai/clip-vit-base-patch32"
     embedding_model_name: str = "sentence-transformers/paraphrase-multilingual-mpnet-base-v2"
+    # Text model inference backend: "torch", or "onnx" for ONNX Runtime on CPU (needs onnxruntime)
+    text_model_backend: str = "torch"
+    # Quantize the text model's linear layers to int8 when running on CPU
+    quantize_text_model: bool = True
+    # Compile the text model with torch.compile (slow first calls, faster steady state)
+    compile_text_model: bool = False
 
     # Data Paths
     model_cache_dir: str = "./data/models/pretrained"
@@ -37,5 +50,19 @@ class Settings(BaseSettings):
         protected_namespaces = ()
 
 
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings, read from the environment once
+
+    get_settings.cache_clear() only affects later get_settings() calls; modules that
+    did `from config.settings import settings` keep the instance they imported.
+    """
+    return Settings()
+
+
+def __getattr__(name):
+    """Create the global settings instance on first access"""
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
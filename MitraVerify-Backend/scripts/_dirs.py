@@ -0,0 +1,20 @@
+"""
+Directory helpers shared by the MitraVerify scripts
+"""
+import os
+from pathlib import Path
+
+
+def make_dirs(directory: Path):
+    """Create a directory, only walking up to missing ancestors when mkdir fails"""
+    try:
+        os.mkdir(directory)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        make_dirs(directory.parent)
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            # Another thread created it after the parent appeared
+            pass
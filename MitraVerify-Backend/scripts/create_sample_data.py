@@ -4,7 +4,6 @@ Sample Data Creation Script for MitraVerify
 Creates sample datasets for testing and demonstration
 """
 import json
-import os
 import sys
 from pathlib import Path
 
@@ -13,6 +12,41 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from config.settings import settings
+from _dirs import make_dirs
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Write buffer for the sample files
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def sample_text_file() -> Path:
+    """Path of the sample text dataset"""
+    return Path(settings.model_cache_dir).parent / "sample" / "test_texts.json"
+
+
+def sample_evidence_file() -> Path:
+    """Path of the sample evidence database"""
+    return Path(settings.evidence_db_path)
+
+
+def sample_image_dir() -> Path:
+    """Directory holding the sample test images"""
+    return Path(settings.model_cache_dir).parent / "sample" / "test_images"
+
+
+def write_json(path: Path, data):
+    """Write JSON with orjson when available, else compact stdlib json"""
+    if orjson is not None:
+        with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
 
 
 def create_sample_text_data():
@@ -100,11 +134,9 @@ def create_sample_text_data():
         }
     ]
 
-    sample_file = Path(settings.model_cache_dir).parent / "sample" / "test_texts.json"
-    sample_file.parent.mkdir(parents=True, exist_ok=True)
+    sample_file = sample_text_file()
 
-    with open(sample_file, 'w', encoding='utf-8') as f:
-        json.dump(sample_data, f, ensure_ascii=False, indent=2)
+    write_json(sample_file, sample_data)
 
     print(f"Created sample text data: {sample_file}")
     return sample_data
@@ -145,11 +177,9 @@ def create_sample_evidence_data():
         }
     ]
 
-    evidence_file = Path(settings.evidence_db_path)
-    evidence_file.parent.mkdir(parents=True, exist_ok=True)
+    evidence_file = sample_evidence_file()
 
-    with open(evidence_file, 'w', encoding='utf-8') as f:
-        json.dump(evidence_data, f, ensure_ascii=False, indent=2)
+    write_json(evidence_file, evidence_data)
 
     print(f"Created sample evidence data: {evidence_file}")
     return evidence_data
@@ -157,12 +187,11 @@ def create_sample_evidence_data():
 
 def create_sample_image_data():
     """Create sample image data directory structure"""
-    image_dir = Path(settings.model_cache_dir).parent / "sample" / "test_images"
-    image_dir.mkdir(parents=True, exist_ok=True)
+    image_dir = sample_image_dir()
 
     # Create a placeholder file
     placeholder = image_dir / "README.md"
-    with open(placeholder, 'w') as f:
+    with open(placeholder, 'w', buffering=WRITE_BUFFER_SIZE) as f:
         f.write("""# Sample Images Directory
 
 This directory should contain sample images for testing the image analysis functionality.
@@ -187,6 +216,10 @@ def main():
     print("Creating MitraVerify sample data...")
 
     try:
+        # Create every output directory up front
+        for directory in (sample_text_file().parent, sample_evidence_file().parent, sample_image_dir()):
+            make_dirs(directory)
+
         # Create sample text data
         text_data = create_sample_text_data()
         print(f"✓ Created {len(text_data)} sample text entries")
@@ -3,12 +3,13 @@
 Model Download Script for MitraVerify
 Downloads pre-trained models and sets up the model cache
 """
-import os
+import json
 import sys
 import logging
 from pathlib import Path
 import sys
 import codecs
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 if sys.stdout.encoding != 'utf-8':
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
@@ -18,35 +19,82 @@ sys.path.insert(0, str(project_root))
 
 from config.settings import settings
 from config.logging_config import setup_logging
+from _dirs import make_dirs
 
 # Setup logging
 logger = setup_logging()
 
 
+# Parallel file downloads per model repository
+DOWNLOAD_WORKERS = 8
+# Repository folders and weight formats the app never loads (TF, Flax, exports)
+SKIPPED_DIRECTORIES = ("onnx/", "openvino/", "coreml/")
+SKIPPED_SUFFIXES = (".h5", ".msgpack", ".ot", ".onnx", ".tflite", ".mlmodel")
+# PyTorch weight files from_pretrained looks for, single-file and sharded
+WEIGHT_FILES = ("model.safetensors", "pytorch_model.bin")
+WEIGHT_INDEX_FILES = ("model.safetensors.index.json", "pytorch_model.bin.index.json")
+
+
+def _files_to_download(model_name: str) -> list:
+    """Config, tokenizer and module files plus one copy of the PyTorch weights"""
+    from huggingface_hub import HfApi
+
+    files = [
+        name for name in HfApi().list_repo_files(model_name)
+        if not name.startswith(SKIPPED_DIRECTORIES) and not name.endswith(SKIPPED_SUFFIXES)
+    ]
+    # from_pretrained prefers safetensors, so skip the duplicate .bin weights
+    if any(name.endswith(".safetensors") for name in files):
+        files = [name for name in files if not name.endswith(".bin")]
+    return files
+
+
+def _is_cached(model_name: str) -> bool:
+    """Whether a cached snapshot of the model holds both its config and its weights"""
+    from huggingface_hub import snapshot_download
+
+    try:
+        snapshot_dir = Path(snapshot_download(
+            repo_id=model_name,
+            cache_dir=settings.model_cache_dir,
+            local_files_only=True
+        ))
+    except Exception:
+        return False
+
+    # A download that stopped after the config would otherwise be skipped forever
+    if not (snapshot_dir / "config.json").is_file():
+        return False
+    for index_name in WEIGHT_INDEX_FILES:
+        index_file = snapshot_dir / index_name
+        if index_file.is_file():
+            # Sharded weights: every shard must be present
+            shards = set(json.loads(index_file.read_text())["weight_map"].values())
+            return all((snapshot_dir / shard).is_file() for shard in shards)
+    return any((snapshot_dir / name).is_file() for name in WEIGHT_FILES)
+
+
+def _snapshot(model_name: str):
+    """Fetch the files needed to load a model into the cache without loading it"""
+    from huggingface_hub import snapshot_download
+
+    if _is_cached(model_name):
+        logger.info(f"Model already cached, skipping download: {model_name}")
+        return
+
+    snapshot_download(
+        repo_id=model_name,
+        cache_dir=settings.model_cache_dir,
+        allow_patterns=_files_to_download(model_name),
+        max_workers=DOWNLOAD_WORKERS
+    )
+
+
 def download_text_model():
     """Download MURIL text model"""
     try:
-        logger.info("Downloading MURIL text model...")
-        from transformers import AutoTokenizer, AutoModelForSequenceClassification
-
-        model_name = settings.text_model_name
-        cache_dir = settings.model_cache_dir
-
-        logger.info(f"Downloading tokenizer: {model_name}")
-        tokenizer = AutoTokenizer.from_pretrained(
-            model_name,
-            cache_dir=cache_dir
-        )
-
-        logger.info(f"Downloading model: {model_name}")
-        model = AutoModelForSequenceClassification.from_pretrained(
-            model_name,
-            cache_dir=cache_dir,
-            num_labels=2,
-            id2label={0: "reliable", 1: "misinformation"},
-            label2id={"reliable": 0, "misinformation": 1}
-        )
-
+        logger.info(f"Downloading text model: {settings.text_model_name}")
+        _snapshot(settings.text_model_name)
         logger.info("Text model downloaded successfully")
         return True
 
@@ -58,22 +106,8 @@ def download_text_model():
 def download_embedding_model():
     """Download sentence transformer model"""
     try:
-        logger.info("Downloading sentence transformer model...")
-        # Import here to avoid linter warnings when package is not installed
-        import sentence_transformers
-        from sentence_transformers import SentenceTransformer
-
-        model_name = settings.embedding_model_name
-        cache_dir = settings.model_cache_dir
-
-        logger.info(f"Downloading embedding model: {model_name}")
-        model = SentenceTransformer(model_name, cache_folder=cache_dir)
-
-        # Test the model
-        test_sentences = ["This is a test sentence.", "यह एक परीक्षण वाक्य है।"]
-        embeddings = model.encode(test_sentences)
-        logger.info(f"Embedding model test successful. Output shape: {embeddings.shape}")
-
+        logger.info(f"Downloading embedding model: {settings.embedding_model_name}")
+        _snapshot(settings.embedding_model_name)
         logger.info("Embedding model downloaded successfully")
         return True
 
@@ -85,24 +119,8 @@ def download_embedding_model():
 def download_image_model():
     """Download CLIP model for image analysis"""
     try:
-        logger.info("Downloading CLIP image model...")
-        from transformers import CLIPProcessor, CLIPModel
-
-        model_name = settings.image_model_name
-        cache_dir = settings.model_cache_dir
-
-        logger.info(f"Downloading CLIP processor: {model_name}")
-        processor = CLIPProcessor.from_pretrained(
-            model_name,
-            cache_dir=cache_dir
-        )
-
-        logger.info(f"Downloading CLIP model: {model_name}")
-        model = CLIPModel.from_pretrained(
-            model_name,
-            cache_dir=cache_dir
-        )
-
+        logger.info(f"Downloading CLIP model: {settings.image_model_name}")
+        _snapshot(settings.image_model_name)
         logger.info("CLIP model downloaded successfully")
         return True
 
@@ -120,8 +138,9 @@ def setup_directories():
             Path(settings.image_db_path)
         ]
 
-        for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
+        # Shallow paths first so nested ones find their parents in place
+        for directory in sorted(directories, key=lambda d: len(d.parts)):
+            make_dirs(directory)
             logger.info(f"Created directory: {directory}")
 
         return True
@@ -150,13 +169,20 @@ def main():
         ("Image Model (CLIP)", download_image_model)
     ]
 
-    for model_name, download_func in models:
-        logger.info(f"Downloading {model_name}...")
-        if download_func():
-            success_count += 1
-            logger.info(f"✓ {model_name} downloaded successfully")
-        else:
-            logger.error(f"✗ Failed to download {model_name}")
+    # Downloads are network-bound, so fetch all models at once
+    with ThreadPoolExecutor(max_workers=len(models)) as executor:
+        futures = {}
+        for model_name, download_func in models:
+            logger.info(f"Downloading {model_name}...")
+            futures[executor.submit(download_func)] = model_name
+
+        for future in as_completed(futures):
+            model_name = futures[future]
+            if future.result():
+                success_count += 1
+                logger.info(f"✓ {model_name} downloaded successfully")
+            else:
+                logger.error(f"✗ Failed to download {model_name}")
 
     # Summary
     logger.info(f"Download complete: {success_count}/{total_models} models downloaded")
@@ -0,0 +1,13 @@
+"""
+Shared FastAPI Dependencies for MitraVerify
+"""
+_fusion_engine = None
+
+
+def get_engine():
+    """Return the global fusion engine, loading the models on first use"""
+    global _fusion_engine
+    if _fusion_engine is None:
+        from core.fusion_engine import fusion_engine
+        _fusion_engine = fusion_engine
+    return _fusion_engine
@@ -1,22 +1,58 @@
 """
 Verification API Endpoints
 """
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
-import tempfile
-import os
-from pathlib import Path
 
-from core.fusion_engine import fusion_engine
+from api.dependencies import get_engine
+from utils.uploads import save_upload, remove_upload
 
 
 router = APIRouter()
 
+# Upload validation, built once at import
+IMAGE_SUFFIXES = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp'
+}
+UNSUPPORTED_TYPE_MESSAGE = f"Unsupported file type. Allowed: {', '.join(IMAGE_SUFFIXES)}"
+
+# Leading bytes identifying each supported image format
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", 'image/jpeg'),
+    (b"\x89PNG\r\n\x1a\n", 'image/png'),
+    (b"GIF8", 'image/gif'),
+)
+SIGNATURE_LENGTH = 16
+
+
+def detect_image_type(head: bytes) -> Optional[str]:
+    """Detect the MIME type of an image from its leading bytes"""
+    for signature, content_type in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return 'image/webp'
+    return None
+
+
+async def read_image_head(file: UploadFile):
+    """Read the start of an upload and reject it unless it is a supported image"""
+    head = await file.read(SIGNATURE_LENGTH)
+    content_type = detect_image_type(head)
+    if content_type is None:
+        raise HTTPException(status_code=400, detail=UNSUPPORTED_TYPE_MESSAGE)
+    return head, content_type
+
 
 @router.post("/verify")
 async def verify_content(
     text: Optional[str] = Form(None),
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    engine=Depends(get_engine)
 ):
     """
     Verify content for misinformation
@@ -28,6 +64,7 @@ async def verify_content(
     Returns:
         Verification result with verdict, confidence, and explanation
     """
+    image_path = None
     try:
         # Validate input
         if not text and not file:
@@ -36,42 +73,29 @@ async def verify_content(
                 detail="Either text or file must be provided"
             )
 
-        image_path = None
-
         # Handle file upload
         if file:
-            # Validate file type
-            allowed_types = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
-            if file.content_type not in allowed_types:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Unsupported file type. Allowed: {', '.join(allowed_types)}"
-                )
+            # Validate file type from its content
+            head, content_type = await read_image_head(file)
 
             # Save uploaded file temporarily
-            suffix = Path(file.filename).suffix or '.jpg'
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                image_path = temp_file.name
+            image_path = await save_upload(file, default_suffix=IMAGE_SUFFIXES[content_type], head=head)
 
         # Analyze content
-        result = fusion_engine.analyze_content(text=text, image_path=image_path)
-
-        # Clean up temporary file
-        if image_path and os.path.exists(image_path):
-            os.unlink(image_path)
-
-        return result
+        return await run_in_threadpool(engine.analyze_content, text=text, image_path=image_path)
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+    finally:
+        # Clean up temporary file
+        if image_path:
+            remove_upload(image_path)
 
 
 @router.post("/verify/text")
-async def verify_text(text: str = Form(...)):
+async def verify_text(text: str = Form(...), engine=Depends(get_engine)):
     """
     Verify text content for misinformation
 
@@ -85,8 +109,7 @@ async def verify_text(text: str = Form(...)):
         if not text or not text.strip():
             raise HTTPException(status_code=400, detail="Text content is required")
 
-        result = fusion_engine.analyze_content(text=text)
-        return result
+        return await run_in_threadpool(engine.analyze_content, text=text)
 
     except HTTPException:
         raise
@@ -95,7 +118,7 @@ async def verify_text(text: str = Form(...)):
 
 
 @router.post("/verify/image")
-async def verify_image(file: UploadFile = File(...)):
+async def verify_image(file: UploadFile = File(...), engine=Depends(get_engine)):
     """
     Verify image for manipulation
 
@@ -105,35 +128,25 @@ async def verify_image(file: UploadFile = File(...)):
     Returns:
         Image verification result
     """
+    image_path = None
     try:
-        # Validate file type
-        allowed_types = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
-        if file.content_type not in allowed_types:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported file type. Allowed: {', '.join(allowed_types)}"
-            )
+        # Validate file type from its content
+        head, content_type = await read_image_head(file)
 
         # Save uploaded file temporarily
-        suffix = Path(file.filename).suffix or '.jpg'
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            image_path = temp_file.name
+        image_path = await save_upload(file, default_suffix=IMAGE_SUFFIXES[content_type], head=head)
 
         # Analyze image
-        result = fusion_engine.analyze_content(image_path=image_path)
-
-        # Clean up temporary file
-        if os.path.exists(image_path):
-            os.unlink(image_path)
-
-        return result
+        return await run_in_threadpool(engine.analyze_content, image_path=image_path)
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image analysis failed: {str(e)}")
+    finally:
+        # Clean up temporary file
+        if image_path:
+            remove_upload(image_path)
 
 
 @router.get("/stats")
@@ -142,7 +155,7 @@ async def get_stats():
     return {
         "status": "operational",
         "supported_languages": ["en", "hi"],
-        "supported_formats": ["text", "image/jpeg", "image/png", "image/gif", "image/webp"],
+        "supported_formats": ["text", *IMAGE_SUFFIXES],
         "model_info": {
             "text_model": "google/muril-base-cased",
             "image_model": "perceptual_hashing",
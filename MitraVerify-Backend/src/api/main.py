@@ -1,15 +1,16 @@
 """
 Main FastAPI Application for MitraVerify
 """
+import asyncio
 import logging
 import uvicorn
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
-import tempfile
 import os
 import sys
-from pathlib import Path
 
 # Add the project root and src directory to the Python path
 project_root = os.path.join(os.path.dirname(__file__), '..', '..')
@@ -19,8 +20,9 @@ sys.path.insert(0, src_dir)
 
 from config.settings import settings
 from config.logging_config import setup_logging
-from core.fusion_engine import fusion_engine
-from api.endpoints.verification import router as verification_router
+from api.dependencies import get_engine
+from utils.uploads import save_upload, remove_upload
+from api.endpoints.verification import IMAGE_SUFFIXES, read_image_head, router as verification_router
 from api.endpoints.health import router as health_router
 
 
@@ -33,7 +35,8 @@ app = FastAPI(
     description="AI-powered misinformation detection system for Indian digital ecosystem",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -53,6 +56,31 @@ app.add_middleware(
 app.include_router(verification_router, prefix="/api/v1", tags=["verification"])
 app.include_router(health_router, prefix="/api/v1", tags=["health"])
 
+# Load models before workers fork so they share the weights copy-on-write
+if settings.preload_models:
+    get_engine()
+
+
+@app.on_event("startup")
+async def warm_up_models():
+    """Load the analysis models in the background while the server starts accepting requests"""
+    app.state.warmup_task = asyncio.create_task(run_in_threadpool(get_engine))
+    app.state.warmup_task.add_done_callback(_log_warmup_failure)
+
+
+def _log_warmup_failure(task: asyncio.Task):
+    """Report a failed background model load instead of leaving it to garbage collection"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background model loading failed: {task.exception()}")
+
+
+@app.on_event("shutdown")
+async def cancel_warm_up():
+    """Stop waiting on a model load still running at shutdown"""
+    task = getattr(app.state, "warmup_task", None)
+    if task is not None and not task.done():
+        task.cancel()
+
 
 @app.get("/")
 async def root():
@@ -67,13 +95,15 @@ async def root():
 @app.post("/api/v1/analyze")
 async def analyze_content(
     text: Optional[str] = Form(None),
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    engine=Depends(get_engine)
 ):
     """
     Analyze content for misinformation
 
     Supports both text and image analysis
     """
+    image_path = None
     try:
         # Validate input
         if not text and not file:
@@ -82,37 +112,26 @@ async def analyze_content(
                 detail="Either text or file must be provided"
             )
 
-        image_path = None
-
         # Handle file upload
         if file:
-            # Validate file type
-            if not file.content_type.startswith(('image/', 'text/')):
-                raise HTTPException(
-                    status_code=400,
-                    detail="Only image and text files are supported"
-                )
+            # Validate file type from its content, not the client-sent header
+            head, content_type = await read_image_head(file)
 
             # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=Path(file.filename).suffix) as temp_file:
-                content = await file.read()
-                temp_file.write(content)
-                image_path = temp_file.name
+            image_path = await save_upload(file, default_suffix=IMAGE_SUFFIXES[content_type], head=head)
 
         # Analyze content
-        result = fusion_engine.analyze_content(text=text, image_path=image_path)
-
-        # Clean up temporary file
-        if image_path and os.path.exists(image_path):
-            os.unlink(image_path)
-
-        return result
+        return await run_in_threadpool(engine.analyze_content, text=text, image_path=image_path)
 
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error in analyze endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Clean up temporary file
+        if image_path:
+            remove_upload(image_path)
 
 
 @app.get("/health")
@@ -127,7 +146,9 @@ def main():
         "main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=settings.debug,
+        workers=settings.api_workers,
+        # Reload mode only supports a single worker process
+        reload=settings.debug and settings.api_workers == 1,
         log_level=settings.log_level.lower()
     )
 
@@ -3,13 +3,53 @@ Calibration Module for MitraVerify
 Implements confidence calibration for model predictions
 """
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import numpy as np
-from sklearn.calibration import CalibratedClassifierCV
+from scipy.optimize import minimize
+from scipy.special import expit
 
 logger = logging.getLogger(__name__)
 
 
+def fit_platt_scaling(predictions, labels) -> Tuple[float, float]:
+    """
+    Fit Platt scaling parameters by minimizing log loss
+
+    Args:
+        predictions: Raw prediction probabilities
+        labels: True binary labels
+
+    Returns:
+        (a, b) such that the calibrated probability is 1 / (1 + exp(a * p + b))
+    """
+    x = np.asarray(predictions, dtype=np.float64)
+    y = np.asarray(labels, dtype=np.float64)
+
+    def loss_and_grad(params):
+        a, b = params
+        z = a * x + b
+        # Negative log likelihood of y under p = sigmoid(-z), computed stably
+        loss = np.sum(y * np.logaddexp(0, z) + (1 - y) * np.logaddexp(0, -z))
+        residual = y - expit(-z)
+        return loss, np.array([np.dot(residual, x), np.sum(residual)])
+
+    # Start from the label prior, as in Platt's original method
+    n_pos = float(y.sum())
+    n_neg = len(y) - n_pos
+    start = np.array([0.0, np.log((n_neg + 1) / (n_pos + 1))])
+
+    result = minimize(loss_and_grad, start, jac=True, method="L-BFGS-B")
+    a, b = result.x
+    return float(a), float(b)
+
+
+def apply_platt_scaling(params: Tuple[float, float], predictions) -> np.ndarray:
+    """Apply fitted Platt scaling parameters to raw prediction probabilities"""
+    a, b = params
+    predictions = np.asarray(predictions, dtype=np.float32)
+    return expit(-(a * predictions + b)).astype(np.float32)
+
+
 class ConfidenceCalibrator:
     """Confidence calibrator for model predictions"""
 
@@ -41,14 +81,11 @@ class ConfidenceCalibrator:
                 return False
 
             # Prepare data
-            X = np.array(predictions).reshape(-1, 1)
-            y = np.array(true_labels)
+            predictions = np.asarray(predictions, dtype=np.float32)
+            true_labels = np.asarray(true_labels, dtype=np.int8)
 
             # Fit calibrator
-            calibrator = CalibratedClassifierCV(cv='prefit')
-            calibrator.fit(X, y)
-
-            self.calibrators[model_name] = calibrator
+            self.calibrators[model_name] = fit_platt_scaling(predictions, true_labels)
             self.calibration_data[model_name] = {
                 'predictions': predictions,
                 'labels': true_labels
@@ -76,39 +113,69 @@ class ConfidenceCalibrator:
             logger.warning(f"No calibrator found for model: {model_name}")
             return prediction
 
-        try:
-            calibrator = self.calibrators[model_name]
-            calibrated = calibrator.predict_proba([[prediction]])[0]
+        return float(self.calibrate_predictions(model_name, [prediction])[0])
+
+    def calibrate_predictions(self, model_name: str, predictions) -> np.ndarray:
+        """
+        Apply calibration to many predictions in one call
 
-            # Return probability for positive class (misinformation)
-            return float(calibrated[1])
+        Args:
+            model_name: Name/identifier of the model
+            predictions: Sequence or array of raw prediction probabilities
+
+        Returns:
+            Array of calibrated prediction probabilities
+        """
+        # float64, so uncalibrated predictions come back exactly as given
+        predictions = np.asarray(predictions, dtype=np.float64)
+
+        if model_name not in self.calibrators:
+            logger.warning(f"No calibrator found for model: {model_name}")
+            return predictions
+
+        try:
+            # Probability for positive class (misinformation)
+            return apply_platt_scaling(self.calibrators[model_name], predictions)
 
         except Exception as e:
             logger.error(f"Error applying calibration: {e}")
-            return prediction
+            return predictions
+
+    def get_calibration_stats(self, model_name: str,
+                              adaptive_bins: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get calibration statistics for a model
+
+        Args:
+            model_name: Name/identifier of the model
+            adaptive_bins: Use equal-frequency instead of equal-width ECE bins
 
-    def get_calibration_stats(self, model_name: str) -> Optional[Dict[str, Any]]:
-        """Get calibration statistics for a model"""
+        Returns:
+            Dict with ECE, sample count and accuracy, or None if not calibrated
+        """
         if model_name not in self.calibration_data:
             return None
 
         data = self.calibration_data[model_name]
-        predictions = np.array(data['predictions'])
-        labels = np.array(data['labels'])
+        predictions = data['predictions']
+        labels = data['labels']
 
         # Calculate ECE (Expected Calibration Error)
         n_bins = 10
-        bins = np.linspace(0, 1, n_bins + 1)
-        bin_indices = np.digitize(predictions, bins) - 1
-
-        ece = 0
-        for i in range(n_bins):
-            mask = bin_indices == i
-            if np.sum(mask) > 0:
-                bin_pred = np.mean(predictions[mask])
-                bin_true = np.mean(labels[mask])
-                bin_size = np.sum(mask)
-                ece += (bin_size / len(predictions)) * abs(bin_pred - bin_true)
+        if adaptive_bins:
+            bins = np.quantile(predictions, np.linspace(0, 1, n_bins + 1))
+        else:
+            bins = np.linspace(0, 1, n_bins + 1)
+        # Interior edges only, so a prediction of exactly 1.0 lands in the last bin
+        bin_indices = np.digitize(predictions, bins[1:-1])
+
+        counts = np.bincount(bin_indices, minlength=n_bins)
+        sum_pred = np.bincount(bin_indices, weights=predictions, minlength=n_bins)
+        sum_true = np.bincount(bin_indices, weights=labels, minlength=n_bins)
+
+        filled = counts > 0
+        gaps = np.abs(sum_pred[filled] - sum_true[filled]) / counts[filled]
+        ece = np.sum(counts[filled] * gaps) / len(predictions)
 
         return {
             'ece': float(ece),
@@ -124,7 +191,7 @@ class ConfidenceCalibrator:
                 pickle.dump({
                     'calibrators': self.calibrators,
                     'calibration_data': self.calibration_data
-                }, f)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
             logger.info(f"Calibration data saved to {filepath}")
         except Exception as e:
             logger.error(f"Error saving calibration: {e}")
@@ -136,7 +203,13 @@ class ConfidenceCalibrator:
             with open(filepath, 'rb') as f:
                 data = pickle.load(f)
                 self.calibrators = data.get('calibrators', {})
-                self.calibration_data = data.get('calibration_data', {})
+                self.calibration_data = {
+                    name: {
+                        'predictions': np.asarray(entry['predictions'], dtype=np.float32),
+                        'labels': np.asarray(entry['labels'], dtype=np.int8)
+                    }
+                    for name, entry in data.get('calibration_data', {}).items()
+                }
             logger.info(f"Calibration data loaded from {filepath}")
         except Exception as e:
             logger.error(f"Error loading calibration: {e}")
@@ -2,18 +2,113 @@
 Evidence Retrieval Module for MitraVerify
 Basic fact-checking against curated sources
 """
+import atexit
+import hashlib
 import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from typing import Dict, List, Optional, Any
 import json
 from pathlib import Path
 import numpy as np
-from sentence_transformers import SentenceTransformer
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from config.settings import settings
+from core.model_registry import get_sentence_transformer
+from utils.similarity import EMBEDDING_DTYPE, cosine_similarities
 
 
 logger = logging.getLogger(__name__)
 
+# Minimum cosine similarity for evidence to be returned
+SIMILARITY_THRESHOLD = 0.3
+
+
+# Corpus size at which an HNSW index replaces the linear scan (needs faiss)
+HNSW_MIN_ITEMS = 5000
+HNSW_NEIGHBORS = 32
+
+# Query coalescing: largest batch and longest wait for more queries
+QUERY_BATCH_SIZE = 32
+QUERY_BATCH_WAIT = 0.005
+
+# Batch size when encoding the whole corpus
+CORPUS_BATCH_SIZE = 256
+
+
+class QueryBatcher:
+    """Coalesces concurrent query encodes into batched forward passes"""
+
+    def __init__(self, encode_fn, max_batch_size: int = QUERY_BATCH_SIZE,
+                 max_wait: float = QUERY_BATCH_WAIT):
+        """Initialize the batcher around a function encoding a list of texts"""
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.SimpleQueue()
+        self._worker = None
+        self._lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self):
+        """Threads do not survive fork (e.g. preloaded uvicorn/gunicorn workers), so start over in the child"""
+        self._queue = queue.SimpleQueue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def encode(self, text: str) -> np.ndarray:
+        """Encode one text, sharing a forward pass with queries submitted alongside it"""
+        future = Future()
+        self._queue.put((text, future))
+        self._ensure_worker()
+        return future.result()
+
+    def _ensure_worker(self):
+        """Start the background encoding thread on first use"""
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="evidence-query-batcher",
+                                                daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        """Collect queued queries for up to max_wait seconds and encode them together"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                embeddings = self.encode_fn([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
+
 
 class EvidenceRetriever:
     """Evidence retriever for fact-checking"""
@@ -25,9 +120,15 @@ class EvidenceRetriever:
         self.model = None
         self.evidence_data = []
         self.embeddings = None
+        self.index = None
+        self._corpus_digest = None
+        self._cache_file = None
+        self._cache_dirty = False
+        self.query_batcher = QueryBatcher(self._encode)
 
         self._load_evidence_database()
         self._load_embedding_model()
+        atexit.register(self.flush_embedding_cache)
 
     def _load_evidence_database(self):
         """Load the fact-check evidence database"""
@@ -37,13 +138,27 @@ class EvidenceRetriever:
             return
 
         try:
-            with open(self.evidence_db_path, 'r', encoding='utf-8') as f:
-                self.evidence_data = json.load(f)
+            self.evidence_data = self._read_evidence_file()
             logger.info(f"Loaded {len(self.evidence_data)} evidence items")
         except Exception as e:
             logger.error(f"Error loading evidence database: {e}")
             self.evidence_data = []
 
+    def _read_evidence_file(self) -> List[Dict[str, Any]]:
+        """Read the evidence database, with orjson when available"""
+        if orjson is not None:
+            return orjson.loads(self.evidence_db_path.read_bytes())
+        with open(self.evidence_db_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_evidence_file(self, data: List[Dict[str, Any]]):
+        """Write the evidence database, with orjson when available"""
+        if orjson is not None:
+            self.evidence_db_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            return
+        with open(self.evidence_db_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
     def _create_sample_evidence(self):
         """Create sample evidence database for MVP"""
         sample_evidence = [
@@ -80,8 +195,7 @@ class EvidenceRetriever:
 
         # Save to file
         try:
-            with open(self.evidence_db_path, 'w', encoding='utf-8') as f:
-                json.dump(sample_evidence, f, ensure_ascii=False, indent=2)
+            self._write_evidence_file(sample_evidence)
             logger.info("Created sample evidence database")
         except Exception as e:
             logger.error(f"Error creating sample evidence: {e}")
@@ -89,22 +203,125 @@ class EvidenceRetriever:
     def _load_embedding_model(self):
         """Load the sentence transformer model"""
         try:
-            self.model = SentenceTransformer(
-                self.embedding_model_name,
-                cache_folder=settings.model_cache_dir
-            )
+            self.model = get_sentence_transformer(self.embedding_model_name)
             logger.info("Embedding model loaded successfully")
 
             # Generate embeddings for evidence
             if self.evidence_data:
                 texts = [item['claim'] for item in self.evidence_data]
-                self.embeddings = self.model.encode(texts, convert_to_numpy=True)
-                logger.info(f"Generated embeddings for {len(texts)} evidence items")
+                self.embeddings = self._load_corpus_embeddings(texts)
+                self._build_index()
 
         except Exception as e:
             logger.error(f"Error loading embedding model: {e}")
             self.model = None
 
+    @staticmethod
+    def _update_digest(digest, text: str):
+        """Add one corpus text to the running digest, length-prefixed so texts can't run together"""
+        encoded = text.encode('utf-8')
+        digest.update(len(encoded).to_bytes(8, 'little'))
+        digest.update(encoded)
+
+    def _start_corpus_digest(self, texts: List[str]):
+        """Digest the model name and corpus; kept running so additions don't rehash the corpus"""
+        self._corpus_digest = hashlib.sha1()
+        self._update_digest(self._corpus_digest, self.embedding_model_name)
+        for text in texts:
+            self._update_digest(self._corpus_digest, text)
+
+    def _embedding_cache_file(self) -> Path:
+        """Path of the embedding cache for this model and the current corpus"""
+        key = self._corpus_digest.hexdigest()
+        return Path(settings.model_cache_dir) / "evidence_embeddings" / f"{key}.f16.npy"
+
+    def _load_corpus_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Load corpus embeddings cached on disk for this model and corpus, encoding on a miss"""
+        self._start_corpus_digest(texts)
+        cache_file = self._cache_file = self._embedding_cache_file()
+
+        try:
+            # Stored and searched in float16: the read-only mapping is used as is, so its
+            # pages are shared by every worker process and each query reads half the bytes
+            embeddings = np.load(cache_file, mmap_mode='r')
+            logger.info(f"Loaded cached embeddings for {len(texts)} evidence items")
+            return embeddings
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable embedding cache {cache_file}: {e}")
+
+        embeddings = self._encode(texts, batch_size=CORPUS_BATCH_SIZE).astype(EMBEDDING_DTYPE)
+        logger.info(f"Generated embeddings for {len(texts)} evidence items")
+        self._save_corpus_embeddings(cache_file, embeddings)
+        return embeddings
+
+    def _save_corpus_embeddings(self, cache_file: Path, embeddings: np.ndarray):
+        """Write corpus embeddings to the on-disk cache"""
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            np.save(cache_file, embeddings.astype(EMBEDDING_DTYPE, copy=False))
+        except OSError as e:
+            logger.warning(f"Could not cache evidence embeddings: {e}")
+
+    def _extend_corpus_digest(self, claim: str):
+        """Account for a new claim in the cache key; the file is written by flush_embedding_cache"""
+        if self._corpus_digest is None:
+            self._start_corpus_digest([item['claim'] for item in self.evidence_data])
+        else:
+            self._update_digest(self._corpus_digest, claim)
+        self._cache_dirty = True
+
+    def flush_embedding_cache(self):
+        """Write embeddings added since the last flush to the cache, deleting the superseded file"""
+        if not self._cache_dirty or self.embeddings is None:
+            return
+        old_cache_file, self._cache_file = self._cache_file, self._embedding_cache_file()
+        self._save_corpus_embeddings(self._cache_file, self.embeddings)
+        self._cache_dirty = False
+        if old_cache_file is None:
+            return
+        try:
+            old_cache_file.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not remove stale embedding cache {old_cache_file}: {e}")
+
+    def _build_index(self):
+        """Build an HNSW index over the embeddings once the corpus is large enough"""
+        self.index = None
+        if faiss is None or self.embeddings is None or len(self.embeddings) < HNSW_MIN_ITEMS:
+            return
+
+        self.index = faiss.IndexHNSWFlat(self.embeddings.shape[1], HNSW_NEIGHBORS,
+                                         faiss.METRIC_INNER_PRODUCT)
+        self.index.add(np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        logger.info(f"Built HNSW index over {len(self.embeddings)} evidence items")
+
+    def _search(self, query_embedding: np.ndarray, top_k: int):
+        """Return indices and cosine similarities of the top-k matches, best first"""
+        if self.index is not None:
+            scores, indices = self.index.search(query_embedding[None, :], top_k)
+            found = indices[0] >= 0
+            return indices[0][found], scores[0][found]
+
+        # Cosine similarities; both sides are already unit length
+        similarities = cosine_similarities(self.embeddings, query_embedding)
+
+        # Partition out the top k, sorting only those
+        k = min(top_k, similarities.shape[0])
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), similarities[:0]
+        top_indices = np.argpartition(-similarities, k - 1)[:k]
+        top_indices = top_indices[np.argsort(-similarities[top_indices])]
+        return top_indices, similarities[top_indices]
+
+    def _encode(self, texts: List[str], batch_size: int = QUERY_BATCH_SIZE) -> np.ndarray:
+        """Encode texts as L2-normalized float32 rows, so a dot product is cosine similarity"""
+        # encode() sorts texts by length internally, so each batch is padded minimally
+        embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True,
+                                       normalize_embeddings=True, show_progress_bar=False)
+        return embeddings.astype(np.float32, copy=False)
+
     def retrieve_evidence(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """
         Retrieve relevant evidence for a given query
@@ -116,30 +333,24 @@ class EvidenceRetriever:
         Returns:
             List of relevant evidence items
         """
-        if not self.model or not self.embeddings:
+        if not self.model or self.embeddings is None:
             logger.warning("Embedding model not available")
             return []
 
         try:
-            # Encode query
-            query_embedding = self.model.encode([query], convert_to_numpy=True)[0]
-
-            # Calculate similarities
-            similarities = np.dot(self.embeddings, query_embedding) / (
-                np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-            )
+            # Encode query, batched with any concurrent requests
+            query_embedding = self.query_batcher.encode(query)
 
-            # Get top-k results
-            top_indices = np.argsort(similarities)[::-1][:top_k]
+            # Get top-k results above the threshold
+            top_indices, top_scores = self._search(query_embedding, top_k)
 
             results = []
-            for idx in top_indices:
-                similarity = float(similarities[idx])
-                # Ensure similarity is a scalar value for comparison
-                if float(similarity) > 0.3:  # Similarity threshold
-                    evidence = self.evidence_data[idx].copy()
-                    evidence['similarity'] = similarity
-                    results.append(evidence)
+            for idx, similarity in zip(top_indices, top_scores):
+                if similarity <= SIMILARITY_THRESHOLD:
+                    break
+                evidence = self.evidence_data[idx].copy()
+                evidence['similarity'] = float(similarity)
+                results.append(evidence)
 
             logger.info(f"Retrieved {len(results)} evidence items for query")
             return results
@@ -163,15 +374,26 @@ class EvidenceRetriever:
 
         self.evidence_data.append(new_evidence)
 
-        # Update embeddings
+        # Update embeddings, encoding only the new claim
         if self.model:
-            texts = [item['claim'] for item in self.evidence_data]
-            self.embeddings = self.model.encode(texts, convert_to_numpy=True)
+            new_embedding = self._encode([claim])
+            stored = new_embedding.astype(EMBEDDING_DTYPE)
+            if self.embeddings is None:
+                self.embeddings = stored
+            else:
+                self.embeddings = np.vstack([self.embeddings, stored])
+
+            if self.index is not None:
+                self.index.add(new_embedding)
+            elif len(self.embeddings) >= HNSW_MIN_ITEMS:
+                self._build_index()
+
+            # Written lazily, so adding N claims doesn't rewrite the matrix N times
+            self._extend_corpus_digest(claim)
 
         # Save to file
         try:
-            with open(self.evidence_db_path, 'w', encoding='utf-8') as f:
-                json.dump(self.evidence_data, f, ensure_ascii=False, indent=2)
+            self._write_evidence_file(self.evidence_data)
             logger.info("Added new evidence to database")
         except Exception as e:
             logger.error(f"Error saving evidence: {e}")
@@ -3,8 +3,10 @@ Fusion Engine for MitraVerify
 Combines text and image analysis results
 """
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from typing import Dict, List, Optional, Any
-import numpy as np
 
 from core.text_analyzer import text_analyzer
 from core.image_analyzer import image_analyzer
@@ -13,6 +15,26 @@ from core.evidence_retrieval import evidence_retriever
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on threads used by batch_analyze
+BATCH_MAX_WORKERS = 8
+
+# (verdict so far, image verdict) -> (new verdict, confidence combiner, explanation)
+IMAGE_FUSION_TABLE = {
+    # Conflict - image suggests manipulation but text is reliable
+    ("reliable", "potentially_manipulated"):
+        ("needs_verification", min, "Image analysis suggests potential manipulation"),
+    # Both suggest issues
+    ("misinformation", "potentially_manipulated"):
+        ("misinformation", max, "Image analysis confirms potential manipulation"),
+    ("unknown", "potentially_manipulated"):
+        ("misinformation", max, "Image analysis confirms potential manipulation"),
+    ("unknown", "authentic"):
+        ("reliable", lambda current, image: image, "Image analysis indicates authentic content"),
+    # Both text and image suggest reliable content
+    ("reliable", "authentic"):
+        ("reliable", max, "Image analysis confirms authentic content"),
+}
+
 
 class FusionEngine:
     """Fusion engine for combining multimodal analysis"""
@@ -35,6 +57,11 @@ class FusionEngine:
         Returns:
             Combined analysis result
         """
+        return self._analyze_content(text, image_path)
+
+    def _analyze_content(self, text: Optional[str] = None, image_path: Optional[str] = None,
+                         text_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """analyze_content, optionally reusing a text analysis computed in a batch"""
         results = {
             "overall_verdict": "unknown",
             "confidence": 0.0,
@@ -46,12 +73,12 @@ class FusionEngine:
         }
 
         try:
-            import time
-            start_time = time.time()
+            start_time = perf_counter()
 
             # Analyze text if provided
             if text:
-                text_result = self.text_analyzer.analyze_text(text)
+                if text_result is None:
+                    text_result = self.text_analyzer.analyze_text(text)
                 results["text_analysis"] = text_result
 
                 # Only retrieve evidence if text analysis was successful
@@ -72,9 +99,10 @@ class FusionEngine:
             overall_result = self._fuse_results(results)
             results.update(overall_result)
 
-            results["processing_time"] = time.time() - start_time
+            results["processing_time"] = perf_counter() - start_time
 
-            logger.info(f"Content analysis completed: {results['overall_verdict']} ({results['confidence']:.3f})")
+            logger.info("Content analysis completed: %s (%.3f)",
+                        results["overall_verdict"], results["confidence"])
             return results
 
         except Exception as e:
@@ -94,18 +122,9 @@ class FusionEngine:
 
         # Text analysis contribution
         if text_result:
-            prediction = text_result.get("prediction")
-            # Safe string comparison to avoid array issues - convert everything to string first
-            prediction_str = str(prediction) if prediction is not None else ""
-            if prediction_str and prediction_str != "error" and prediction_str != "None":
-                text_pred = prediction_str
+            text_pred = text_result.get("prediction")
+            if text_pred and text_pred != "error":
                 text_conf = text_result.get("confidence", 0.5)
-                
-                # Ensure text_conf is a scalar value
-                if isinstance(text_conf, (list, np.ndarray)):
-                    text_conf = float(text_conf[0]) if len(text_conf) > 0 else 0.5
-                else:
-                    text_conf = float(text_conf)
 
                 # Use the model's actual analysis results
                 if text_pred == "misinformation":
@@ -124,35 +143,12 @@ class FusionEngine:
 
         # Image analysis contribution
         if image_result and image_result.get("verdict") != "error":
-            image_verdict = image_result["verdict"]
             image_conf = image_result.get("confidence", 0.5)
-            
-            # Ensure image_conf is a scalar value
-            if isinstance(image_conf, (list, np.ndarray)):
-                image_conf = float(image_conf[0]) if len(image_conf) > 0 else 0.5
-            else:
-                image_conf = float(image_conf)
-
-            if image_verdict == "potentially_manipulated":
-                if overall_verdict == "reliable":
-                    # Conflict - image suggests manipulation but text is reliable
-                    overall_verdict = "needs_verification"
-                    confidence = min(confidence, image_conf)
-                    explanations.append(f"Image analysis suggests potential manipulation with {image_conf:.1%} confidence")
-                else:
-                    # Both suggest issues
-                    overall_verdict = "misinformation"
-                    confidence = max(confidence, image_conf)
-                    explanations.append(f"Image analysis confirms potential manipulation with {image_conf:.1%} confidence")
-            elif image_verdict == "authentic":
-                if overall_verdict == "unknown":
-                    overall_verdict = "reliable"
-                    confidence = image_conf
-                    explanations.append(f"Image analysis indicates authentic content with {image_conf:.1%} confidence")
-                elif overall_verdict == "reliable":
-                    # Both text and image suggest reliable content
-                    confidence = max(confidence, image_conf)
-                    explanations.append(f"Image analysis confirms authentic content with {image_conf:.1%} confidence")
+            transition = IMAGE_FUSION_TABLE.get((overall_verdict, image_result["verdict"]))
+            if transition:
+                overall_verdict, combine, message = transition
+                confidence = combine(confidence, image_conf)
+                explanations.append(f"{message} with {image_conf:.1%} confidence")
 
         # Evidence contribution
         evidence = results.get("evidence", [])
@@ -167,8 +163,9 @@ class FusionEngine:
                     confidence = min(confidence, 0.6)
                 explanations.append(f"Found {len(false_evidence)} similar debunked claims in evidence database")
 
-        # Ensure confidence is within valid range and is a scalar
-        confidence = max(0.0, min(1.0, float(confidence)))
+        # Ensure confidence is within valid range
+        if not 0.0 <= confidence <= 1.0:
+            confidence = max(0.0, min(1.0, confidence))
 
         # Generate final explanation
         if explanations:
@@ -182,21 +179,54 @@ class FusionEngine:
             "explanation": final_explanation
         }
 
+    def _analyze_item(self, content: Dict[str, Any],
+                      text_result: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Analyze one batch item, turning failures into an error result"""
+        try:
+            return self._analyze_content(text_result=text_result, **content)
+        except Exception as e:
+            logger.error(f"Error in batch analysis: {e}")
+            return {
+                "overall_verdict": "error",
+                "confidence": 0.0,
+                "error": str(e)
+            }
+
     def batch_analyze(self, contents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Analyze multiple content items in batch"""
-        results = []
-        for content in contents:
-            try:
-                result = self.analyze_content(**content)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Error in batch analysis: {e}")
-                results.append({
-                    "overall_verdict": "error",
-                    "confidence": 0.0,
-                    "error": str(e)
-                })
-        return results
+        if len(contents) <= 1:
+            return [self._analyze_item(content) for content in contents]
+
+        text_results = self._batch_text_results(contents)
+
+        # Model forwards and image I/O release the GIL, so items overlap in threads
+        max_workers = min(len(contents), BATCH_MAX_WORKERS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self._analyze_item, contents, text_results))
+
+    def _batch_text_results(self, contents: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Analyze the texts of all batch items in one batched call to the text analyzer
+
+        Returns:
+            Text analysis per item, None for items without text or when batching failed
+        """
+        texts = [content.get("text") for content in contents]
+        batch_texts = [text for text in texts if text]
+        if not batch_texts:
+            return [None] * len(contents)
+
+        try:
+            batch_results = self.text_analyzer.batch_analyze(batch_texts)
+        except Exception as e:
+            logger.warning(f"Batched text analysis failed, analyzing items one by one: {e}")
+            return [None] * len(contents)
+        if not isinstance(batch_results, list) or len(batch_results) != len(batch_texts):
+            return [None] * len(contents)
+
+        # Scatter the results back to the items they came from
+        batch_iter = iter(batch_results)
+        return [next(batch_iter) if text else None for text in texts]
 
 
 # Global fusion engine instance
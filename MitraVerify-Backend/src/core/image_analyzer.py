@@ -2,19 +2,56 @@
 Image Analysis Module for MitraVerify
 Basic image forensics and reuse detection
 """
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 import os
+import sqlite3
+import threading
 from pathlib import Path
 import imagehash
 from PIL import Image
 import numpy as np
 
 from config.settings import settings
+from utils.bktree import BKTree, hamming_distance
 
 
 logger = logging.getLogger(__name__)
 
+# Bounding box of the thumbnail used for manipulation heuristics
+ANALYSIS_SIZE = (256, 256)
+# Largest perceptual hash distance still treated as the same image
+REUSE_MAX_DISTANCE = 6
+# Bits in a perceptual hash (imagehash's default 8x8 phash)
+HASH_BITS = 64
+# Decoded results kept per file digest, so resubmitted files skip decoding
+FILE_CACHE_SIZE = 1024
+# Read size when hashing files without hashlib.file_digest
+DIGEST_CHUNK_SIZE = 1 << 16
+
+
+def _to_db_int(hash_val: int) -> int:
+    """Map an unsigned 64-bit hash onto SQLite's signed INTEGER range"""
+    return hash_val - (1 << 64) if hash_val >= (1 << 63) else hash_val
+
+
+def _from_db_int(value: int) -> int:
+    """Inverse of _to_db_int"""
+    return value + (1 << 64) if value < 0 else value
+
+
+def _file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file's bytes"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(DIGEST_CHUNK_SIZE), b''):
+            digest.update(chunk)
+        return digest.hexdigest()
+
 
 class ImageAnalyzer:
     """Image analyzer for basic forensics and reuse detection"""
@@ -23,33 +60,73 @@ class ImageAnalyzer:
         """Initialize the image analyzer"""
         self.image_db_path = Path(settings.image_db_path)
         self.image_db_path.mkdir(exist_ok=True)
-        self.known_hashes = self._load_known_hashes()
-
-    def _load_known_hashes(self) -> Dict[str, str]:
-        """Load known image hashes from database"""
+        self.hash_tree = BKTree()
+        self._hash_lock = threading.Lock()
+        self.hash_db = self._open_hash_database()
+        self._file_cache = OrderedDict()
+        self._file_cache_lock = threading.Lock()
+
+    def _open_hash_database(self) -> sqlite3.Connection:
+        """Open the known image hash database and load its hashes into the BK-tree"""
+        db_file = self.image_db_path / "image_hashes.db"
+        is_new = not db_file.exists()
+
+        conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        conn.execute("CREATE TABLE IF NOT EXISTS hashes (h INTEGER PRIMARY KEY, name TEXT)")
+        if is_new:
+            self._import_legacy_hashes(conn)
+
+        for (hash_val,) in conn.execute("SELECT h FROM hashes"):
+            self.hash_tree.add(_from_db_int(hash_val))
+        logger.info(f"Loaded {len(self.hash_tree)} known image hashes")
+
+        return conn
+
+    def _import_legacy_hashes(self, conn: sqlite3.Connection):
+        """Import hashes from the older image_hashes.txt format"""
         hash_file = self.image_db_path / "image_hashes.txt"
-        if not hash_file.exists():
-            return {}
-
-        hashes = {}
         try:
             with open(hash_file, 'r') as f:
+                rows = []
                 for line in f:
                     if ':' in line:
                         hash_val, filename = line.strip().split(':', 1)
-                        hashes[hash_val] = filename
+                        rows.append((_to_db_int(int(hash_val, 16)), filename))
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO hashes (h, name) VALUES (?, ?)", rows)
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            logger.error(f"Error loading image hashes: {e}")
-
-        return hashes
-
-    def _save_hash(self, hash_val: str, filename: str):
+            logger.error(f"Error importing image hashes: {e}")
+
+    def _find_known_hash(self, hash_val: int) -> Optional[str]:
+        """Return the source name of a known image matching or near-matching this hash"""
+        row = self.hash_db.execute(
+            "SELECT name FROM hashes WHERE h = ?", (_to_db_int(hash_val),)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+
+        # Near duplicates, e.g. the same picture re-encoded
+        matches = self.hash_tree.find(hash_val, REUSE_MAX_DISTANCE)
+        if matches:
+            row = self.hash_db.execute(
+                "SELECT name FROM hashes WHERE h = ?", (_to_db_int(matches[0][1]),)
+            ).fetchone()
+            if row is not None:
+                return row[0]
+
+        return None
+
+    def _save_hash(self, hash_val: int, filename: str):
         """Save image hash to database"""
-        hash_file = self.image_db_path / "image_hashes.txt"
         try:
-            with open(hash_file, 'a') as f:
-                f.write(f"{hash_val}:{filename}\n")
-            self.known_hashes[hash_val] = filename
+            with self.hash_db:
+                self.hash_db.execute(
+                    "INSERT OR IGNORE INTO hashes (h, name) VALUES (?, ?)",
+                    (_to_db_int(hash_val), filename)
+                )
+            self.hash_tree.add(hash_val)
         except Exception as e:
             logger.error(f"Error saving image hash: {e}")
 
@@ -64,22 +141,13 @@ class ImageAnalyzer:
             Dict containing analysis results
         """
         try:
-            # Open and validate image
-            image = Image.open(image_path)
-
-            # Calculate perceptual hash
-            phash = imagehash.phash(image)
-            hash_str = str(phash)
+            hash_str, metadata, manipulation_score = self._decode_features(image_path)
+            hash_val = int(hash_str, 16)
 
             # Check for reuse
-            is_reused = hash_str in self.known_hashes
-            reused_source = self.known_hashes.get(hash_str) if is_reused else None
-
-            # Basic metadata analysis
-            metadata = self._extract_metadata(image_path)
-
-            # Simple manipulation detection (basic checks)
-            manipulation_score = self._detect_basic_manipulation(image)
+            with self._hash_lock:
+                reused_source = self._find_known_hash(hash_val)
+            is_reused = reused_source is not None
 
             # Determine verdict
             if is_reused:
@@ -97,10 +165,10 @@ class ImageAnalyzer:
 
             result = {
                 "verdict": verdict,
-                "confidence": confidence,
+                "confidence": float(confidence),
                 "is_reused": is_reused,
                 "reused_source": reused_source,
-                "manipulation_score": manipulation_score,
+                "manipulation_score": float(manipulation_score),
                 "metadata": metadata,
                 "explanation": explanation,
                 "hash": hash_str
@@ -109,7 +177,8 @@ class ImageAnalyzer:
             # Save hash for future comparison
             if not is_reused:
                 filename = Path(image_path).name
-                self._save_hash(hash_str, filename)
+                with self._hash_lock:
+                    self._save_hash(hash_val, filename)
 
             logger.info(f"Image analysis completed: {verdict} ({confidence:.3f})")
             return result
@@ -122,10 +191,45 @@ class ImageAnalyzer:
                 "error": str(e)
             }
 
-    def _extract_metadata(self, image_path: str) -> Dict[str, Any]:
-        """Extract basic metadata from image"""
+    def _decode_features(self, image_path: str) -> Tuple[str, Dict[str, Any], float]:
+        """
+        Decode an image and compute its hash, metadata and manipulation score
+
+        Results are cached by file digest, so an identical file is not decoded again.
+
+        Returns:
+            Tuple of (perceptual hash hex string, metadata, manipulation score)
+        """
+        digest = _file_digest(image_path)
+        with self._file_cache_lock:
+            cached = self._file_cache.get(digest)
+            if cached is not None:
+                self._file_cache.move_to_end(digest)
+                return cached[0], dict(cached[1]), cached[2]
+
+        # Open, validate and decode the image once; all checks below reuse it
+        with Image.open(image_path) as image:
+            image.load()
+
+            # Basic metadata analysis
+            metadata = self._extract_metadata(image)
+
+        # Calculate perceptual hash
+        hash_str = str(imagehash.phash(image))
+
+        # Simple manipulation detection (basic checks)
+        manipulation_score = self._detect_basic_manipulation(image)
+
+        with self._file_cache_lock:
+            self._file_cache[digest] = (hash_str, metadata, manipulation_score)
+            if len(self._file_cache) > FILE_CACHE_SIZE:
+                self._file_cache.popitem(last=False)
+
+        return hash_str, dict(metadata), manipulation_score
+
+    def _extract_metadata(self, image: Image.Image) -> Dict[str, Any]:
+        """Extract basic metadata from an opened image"""
         try:
-            image = Image.open(image_path)
             return {
                 "format": image.format,
                 "size": image.size,
@@ -144,19 +248,28 @@ class ImageAnalyzer:
         """
         score = 0.0
 
-        # Convert to numpy array
-        img_array = np.array(image)
+        # Work on a small thumbnail; the statistics below don't need full resolution.
+        # resize allocates only the small image, unlike copy() + thumbnail()
+        scale = min(ANALYSIS_SIZE[0] / image.width, ANALYSIS_SIZE[1] / image.height, 1.0)
+        if scale < 1.0:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            thumb = image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+        else:
+            thumb = image
+        img_array = np.asarray(thumb, dtype=np.float32)
 
         # Check for unusual color distributions
-        if len(img_array.shape) == 3:
+        if img_array.ndim == 3:
             # Check for uniform colors (possible generated images)
-            std_dev = np.std(img_array, axis=(0, 1))
+            std_dev = np.sqrt(np.var(img_array, axis=(0, 1)))
             if np.mean(std_dev) < 10:  # Very low variance
                 score += 0.3
 
             # Check for artificial patterns
             # This is a very basic check
-            edges = np.abs(np.diff(img_array, axis=0)).mean()
+            diff = np.empty((img_array.shape[0] - 1,) + img_array.shape[1:], dtype=np.float32)
+            np.subtract(img_array[1:], img_array[:-1], out=diff)
+            edges = np.abs(diff, out=diff).mean() if diff.size else 0.0
             if edges < 5:  # Very smooth image
                 score += 0.2
 
@@ -172,16 +285,14 @@ class ImageAnalyzer:
     def compare_images(self, image1_path: str, image2_path: str) -> Dict[str, Any]:
         """Compare two images for similarity"""
         try:
-            img1 = Image.open(image1_path)
-            img2 = Image.open(image2_path)
-
-            hash1 = imagehash.phash(img1)
-            hash2 = imagehash.phash(img2)
-
-            # Calculate Hamming distance
-            distance = hash1 - hash2
-            max_distance = len(str(hash1)) * 4  # Rough max distance
-            similarity = 1 - (distance / max_distance)
+            with Image.open(image1_path) as img1:
+                hash1 = int(str(imagehash.phash(img1)), 16)
+            with Image.open(image2_path) as img2:
+                hash2 = int(str(imagehash.phash(img2)), 16)
+
+            # Calculate Hamming distance between the 64-bit hashes
+            distance = hamming_distance(hash1, hash2)
+            similarity = 1 - (distance / HASH_BITS)
 
             return {
                 "similarity": float(similarity),
@@ -0,0 +1,19 @@
+"""
+Shared Model Registry for MitraVerify
+Loads each embedding model once per process
+"""
+from functools import lru_cache
+
+from sentence_transformers import SentenceTransformer
+
+from config.settings import settings
+
+
+@lru_cache(maxsize=None)
+def get_sentence_transformer(model_name: str) -> SentenceTransformer:
+    """
+    Load a sentence transformer, sharing one instance per model name
+
+    encode() keeps no per-call state, so every caller can use the same instance.
+    """
+    return SentenceTransformer(model_name, cache_folder=settings.model_cache_dir)
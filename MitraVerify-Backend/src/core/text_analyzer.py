@@ -2,19 +2,80 @@
 Text Analysis Module for MitraVerify
 Handles multilingual misinformation detection using MURIL model
 """
+import inspect
 import logging
+import re
+import string
+import threading
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import numpy as np
-from sklearn.calibration import CalibratedClassifierCV
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
 
 from config.settings import settings
+from core.calibration import fit_platt_scaling
 from utils.language_detection import detect_language
 
 
 logger = logging.getLogger(__name__)
 
+# Keep N workers x T threads from oversubscribing the CPU cores
+if settings.torch_num_threads > 0:
+    torch.set_num_threads(settings.torch_num_threads)
+
+# Texts sharing one forward pass in batch_analyze
+TEXT_BATCH_SIZE = 32
+# Longest tokenized input passed to the model
+MAX_SEQUENCE_LENGTH = 512
+# Batch sizes a compiled model is padded up to, so it is specialized for few shapes
+COMPILED_BATCH_BUCKETS = (1, 8, TEXT_BATCH_SIZE)
+# Largest logit difference allowed between an ONNX export and the torch model
+ONNX_EXPORT_TOLERANCE = 1e-3
+
+# Misinformation indicators (strengthen misinformation prediction)
+MISINFO_KEYWORDS = [
+    'fake', 'hoax', 'conspiracy', 'secret', 'hidden', 'exposed', 'truth',
+    'lie', 'cover-up', 'scandal', 'shocking', 'urgent', 'warning'
+]
+
+# Reliability indicators (strengthen reliable prediction)
+RELIABLE_KEYWORDS = [
+    'study', 'research', 'evidence', 'data', 'analysis', 'expert',
+    'scientist', 'doctor', 'professor', 'university', 'official'
+]
+
+
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """Compile keywords into one pattern matching each of them at every position, overlaps included"""
+    return re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+
+
+MISINFO_KEYWORDS_RE = _keyword_pattern(MISINFO_KEYWORDS)
+RELIABLE_KEYWORDS_RE = _keyword_pattern(RELIABLE_KEYWORDS)
+
+ASCII_UPPERCASE = string.ascii_uppercase.encode('ascii')
+
+
+def _count_uppercase(text: str) -> int:
+    """Number of uppercase characters in text"""
+    if text.isascii():
+        # Deleting A-Z with bytes.translate counts them in a single C loop
+        data = text.encode('ascii')
+        return len(data) - len(data.translate(None, ASCII_UPPERCASE))
+    return sum(map(str.isupper, text))
+
+# Loaded models shared by every TextAnalyzer in the process:
+# model name -> (tokenizer, model, ONNX session, compiled)
+_MODEL_CACHE: Dict[str, Tuple[Any, Any, Any, bool]] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
 
 class TextAnalyzer:
     """Text analyzer for misinformation detection"""
@@ -26,20 +87,37 @@ class TextAnalyzer:
         self.model = None
         self.tokenizer = None
         self.calibrator = None
+        self.compiled = False
+        self.onnx_session = None
         self.id2label = {0: "reliable", 1: "misinformation"}
         self.label2id = {v: k for k, v in self.id2label.items()}
 
         self._load_model()
 
     def _load_model(self):
-        """Load the pre-trained MURIL model"""
+        """Load the pre-trained MURIL model, reusing one already loaded in this process"""
+        with _MODEL_CACHE_LOCK:
+            cached = _MODEL_CACHE.get(self.model_name)
+            if cached is None:
+                self._load_model_weights()
+                _MODEL_CACHE[self.model_name] = (
+                    self.tokenizer, self.model, self.onnx_session, self.compiled
+                )
+            else:
+                self.tokenizer, self.model, self.onnx_session, self.compiled = cached
+
+    def _load_model_weights(self):
+        """Load the tokenizer and model weights and prepare them for inference"""
         try:
             logger.info(f"Loading text model: {self.model_name}")
 
             self.tokenizer = AutoTokenizer.from_pretrained(
                 self.model_name,
-                cache_dir=settings.model_cache_dir
+                cache_dir=settings.model_cache_dir,
+                use_fast=True
             )
+            if not self.tokenizer.is_fast:
+                logger.warning(f"No fast tokenizer available for {self.model_name}, tokenization will be slow")
 
             self.model = AutoModelForSequenceClassification.from_pretrained(
                 self.model_name,
@@ -50,21 +128,121 @@ class TextAnalyzer:
             )
 
             self.model.to(self.device)
+            if self.device.type == "cuda":
+                # Half precision halves weight and activation traffic on GPU
+                self.model.half()
             self.model.eval()
 
+            if settings.text_model_backend == "onnx" and self.device.type == "cpu":
+                self._load_onnx_session()
+
+            if self.onnx_session is None:
+                if self.device.type == "cpu" and settings.quantize_text_model:
+                    # int8 weights for nn.Linear layers, run with FBGEMM/oneDNN int8 GEMM kernels
+                    self.model = torch.ao.quantization.quantize_dynamic(
+                        self.model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+
+                if settings.compile_text_model:
+                    self.model = torch.compile(self.model, mode="reduce-overhead", dynamic=False)
+                    self.compiled = True
+
             logger.info("Text model loaded successfully")
 
         except Exception as e:
             logger.error(f"Failed to load text model: {e}")
             raise
 
-    def _preprocess_text(self, text: str) -> str:
-        """Preprocess text for model input"""
+    def _load_onnx_session(self):
+        """Export the model to ONNX once and open an ONNX Runtime session on it"""
+        if onnxruntime is None:
+            logger.warning("onnxruntime is not installed, using the torch backend")
+            return
+
+        try:
+            onnx_dir = Path(settings.model_cache_dir) / "onnx"
+            onnx_path = onnx_dir / f"{self.model_name.replace('/', '--')}.onnx"
+            if not onnx_path.exists():
+                onnx_dir.mkdir(parents=True, exist_ok=True)
+                dummy_inputs = dict(self.tokenizer(["export"], return_tensors="pt"))
+                # torch.onnx.export names the graph inputs positionally in forward() order,
+                # not in the order of the dict the tokenizer returned
+                input_names = [
+                    name for name in inspect.signature(self.model.forward).parameters
+                    if name in dummy_inputs
+                ]
+                dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+                dynamic_axes["logits"] = {0: "batch"}
+                torch.onnx.export(
+                    self.model, (dummy_inputs,), str(onnx_path),
+                    input_names=input_names, output_names=["logits"],
+                    dynamic_axes=dynamic_axes, opset_version=17
+                )
+                try:
+                    self._check_onnx_export(onnx_path, dummy_inputs)
+                except Exception:
+                    onnx_path.unlink(missing_ok=True)
+                    raise
+                logger.info(f"Exported text model to {onnx_path}")
+
+            if settings.quantize_text_model:
+                int8_path = onnx_path.with_suffix(".int8.onnx")
+                if not int8_path.exists():
+                    from onnxruntime.quantization import QuantType, quantize_dynamic
+                    quantize_dynamic(str(onnx_path), str(int8_path), weight_type=QuantType.QInt8)
+                onnx_path = int8_path
+
+            self.onnx_session = onnxruntime.InferenceSession(
+                str(onnx_path), providers=["CPUExecutionProvider"]
+            )
+            logger.info(f"Text model running on ONNX Runtime: {onnx_path.name}")
+
+        except Exception as e:
+            logger.error(f"Error loading ONNX text model, using the torch backend: {e}")
+            self.onnx_session = None
+
+    def _check_onnx_export(self, onnx_path: Path, dummy_inputs: Dict[str, torch.Tensor]):
+        """Raise if the exported graph's logits differ from the torch model's"""
+        session = onnxruntime.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+        feed = {
+            node.name: dummy_inputs[node.name].numpy().astype(np.int64)
+            for node in session.get_inputs()
+        }
+        onnx_logits = session.run(None, feed)[0]
+        with torch.inference_mode():
+            torch_logits = self.model(**dummy_inputs).logits.float().numpy()
+        if not np.allclose(onnx_logits, torch_logits, atol=ONNX_EXPORT_TOLERANCE):
+            raise ValueError(
+                f"ONNX export does not match the torch model "
+                f"(max difference {np.abs(onnx_logits - torch_logits).max():.2e})"
+            )
+
+    def _predict_onnx(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """ONNX Runtime counterpart of _predict"""
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="np",
+            truncation=True,
+            padding=self._padding_strategy(len(texts)),
+            max_length=MAX_SEQUENCE_LENGTH
+        )
+        feed = {
+            node.name: inputs[node.name].astype(np.int64)
+            for node in self.onnx_session.get_inputs()
+        }
+        logits = self.onnx_session.run(None, feed)[0].astype(np.float32)
+
+        # Softmax, shifted by the row max for numerical stability
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        probabilities = exp / exp.sum(axis=1, keepdims=True)
+        return probabilities, probabilities.argmax(axis=1)
+
+    def _preprocess_text(self, text: str, lang: str) -> str:
+        """Preprocess text for model input, given its detected language"""
         # Basic cleaning
         text = text.strip()
 
-        # Language detection and validation
-        lang = detect_language(text)
+        # Language validation
         if lang not in ['en', 'hi']:
             logger.warning(f"Unsupported language detected: {lang}")
 
@@ -83,101 +261,130 @@ class TextAnalyzer:
         try:
             # Detect language
             detected_language = detect_language(text)
-            
-            # Preprocess text
-            processed_text = self._preprocess_text(text)
-
-            # Tokenize
-            inputs = self.tokenizer(
-                processed_text,
-                return_tensors="pt",
-                truncation=True,
-                padding=True,
-                max_length=512
-            )
 
-            # Move to device
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            # Preprocess text
+            processed_text = self._preprocess_text(text, detected_language)
 
             # Get prediction
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1).cpu().numpy()[0]
-
-            # Get raw model prediction
-            predicted_class = int(np.argmax(probabilities))
-            raw_confidence = float(probabilities[predicted_class])
-
-            # Enhance prediction with content-based features
-            enhanced_result = self._enhance_prediction(text, predicted_class, raw_confidence, probabilities, detected_language)
-
-            # Generate explanation
-            explanation = self._generate_explanation(
-                text, enhanced_result["prediction"], enhanced_result["confidence"]
-            )
+            probabilities, predicted_classes = self._predict([processed_text])
 
-            result = {
-                "prediction": enhanced_result["prediction"],
-                "confidence": enhanced_result["confidence"],
-                "probabilities": enhanced_result["probabilities"],
-                "language": detect_language(text),
-                "explanation": explanation,
-                "model_used": self.model_name,
-                "raw_model_output": {
-                    "prediction": self.id2label[predicted_class],
-                    "confidence": raw_confidence,
-                    "raw_probabilities": {
-                        "reliable": float(probabilities[0]),
-                        "misinformation": float(probabilities[1])
-                    }
-                }
-            }
+            result = self._build_result(text, probabilities[0].tolist(), int(predicted_classes[0]),
+                                        detected_language)
 
             logger.info(f"Text analysis completed: {result['prediction']} ({result['confidence']:.3f})")
             return result
 
         except Exception as e:
             logger.error(f"Error analyzing text: {e}")
-            return {
-                "prediction": "error",
-                "confidence": 0.0,
-                "error": str(e),
-                "language": detect_language(text) if text else "unknown"
+            return self._error_result(text, e)
+
+    def _padding_strategy(self, count: int):
+        """Tokenizer padding for a batch of count texts"""
+        if self.compiled:
+            # A compiled model sees one fixed sequence length instead of recompiling
+            return "max_length"
+        # A single text has nothing to pad against
+        return "longest" if count > 1 else False
+
+    def _encode_batch(self, texts: List[str]) -> Dict[str, torch.Tensor]:
+        """Tokenize a list of texts into one padded batch on the model device"""
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            truncation=True,
+            padding=self._padding_strategy(len(texts)),
+            max_length=MAX_SEQUENCE_LENGTH,
+            # Single-segment input: the model falls back to its own all-zero segment ids
+            return_token_type_ids=False
+        )
+        if self.device.type == "cuda":
+            # Pinned host memory lets the copies run asynchronously, queued ahead of the forward pass
+            return {k: v.pin_memory().to(self.device, non_blocking=True) for k, v in inputs.items()}
+        return {k: v.to(self.device) for k, v in inputs.items()}
+
+    def _predict(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run a single forward pass over texts
+
+        Returns:
+            Tuple of (class probabilities, one row per text; predicted class per text)
+        """
+        if self.onnx_session is not None:
+            return self._predict_onnx(texts)
+
+        count = len(texts)
+        if self.compiled:
+            bucket = next((size for size in COMPILED_BATCH_BUCKETS if size >= count), count)
+            texts = texts + [""] * (bucket - count)
+
+        inputs = self._encode_batch(texts)
+        with torch.inference_mode():
+            outputs = self.model(**inputs)
+            # Softmax in float32 even when the model runs in half precision
+            logits = outputs.logits[:count].float()
+            probabilities = torch.softmax(logits, dim=1)
+            # argmax on the device, so only the results cross to the host
+            predicted_classes = probabilities.argmax(dim=1)
+            return probabilities.cpu().numpy(), predicted_classes.cpu().numpy()
+
+    def _build_result(self, text: str, probabilities: List[float], predicted_class: int,
+                      detected_language: str) -> Dict[str, Any]:
+        """Turn one row of model probabilities, as Python floats, into an analysis result"""
+        # Get raw model prediction
+        raw_confidence = probabilities[predicted_class]
+
+        # Enhance prediction with content-based features
+        enhanced_result = self._enhance_prediction(text, predicted_class, raw_confidence, probabilities)
+
+        # Generate explanation
+        explanation = self._generate_explanation(
+            text, enhanced_result["prediction"], enhanced_result["confidence"]
+        )
+
+        return {
+            "prediction": str(enhanced_result["prediction"]),
+            "confidence": float(enhanced_result["confidence"]),
+            "probabilities": enhanced_result["probabilities"],
+            "language": detected_language,
+            "explanation": explanation,
+            "model_used": self.model_name,
+            "raw_model_output": {
+                "prediction": self.id2label[predicted_class],
+                "confidence": raw_confidence,
+                "raw_probabilities": {
+                    "reliable": probabilities[0],
+                    "misinformation": probabilities[1]
+                }
             }
+        }
 
-    def _enhance_prediction(self, text: str, predicted_class: int, raw_confidence: float, probabilities: np.ndarray, detected_language: str) -> Dict[str, Any]:
+    def _error_result(self, text: str, error: Exception) -> Dict[str, Any]:
+        """Result returned when a text could not be analyzed"""
+        return {
+            "prediction": "error",
+            "confidence": 0.0,
+            "error": str(error),
+            "language": detect_language(text) if text else "unknown"
+        }
+
+    def _enhance_prediction(self, text: str, predicted_class: int, raw_confidence: float, probabilities: List[float]) -> Dict[str, Any]:
         """
         Enhance the raw model prediction with content-based analysis
         Since MURIL isn't fine-tuned for misinformation, we need to interpret its outputs better
+
+        Returns only prediction, confidence and probabilities; _build_result adds the rest
         """
         text_lower = text.lower()
         
         # Content-based confidence adjustments
         confidence_adjustments = 0.0
         
-        # Language complexity analysis
-        words = text.split()
-        avg_word_length = sum(len(word) for word in words) / len(words) if words else 0
-        
-        # Sentence structure analysis
-        sentences = text.split('.')
-        avg_sentence_length = sum(len(s.split()) for s in sentences) / len(sentences) if sentences else 0
-        
-        # Misinformation indicators (strengthen misinformation prediction)
-        misinfo_keywords = [
-            'fake', 'hoax', 'conspiracy', 'secret', 'hidden', 'exposed', 'truth',
-            'lie', 'cover-up', 'scandal', 'shocking', 'urgent', 'warning'
-        ]
-        
-        # Reliability indicators (strengthen reliable prediction)
-        reliable_keywords = [
-            'study', 'research', 'evidence', 'data', 'analysis', 'expert',
-            'scientist', 'doctor', 'professor', 'university', 'official'
-        ]
-        
-        misinfo_count = sum(1 for keyword in misinfo_keywords if keyword in text_lower)
-        reliable_count = sum(1 for keyword in reliable_keywords if keyword in text_lower)
+        # Only the word count feeds the heuristics below
+        word_count = len(text.split())
+
+        # Number of distinct indicator keywords present in the text
+        misinfo_count = len(set(MISINFO_KEYWORDS_RE.findall(text_lower)))
+        reliable_count = len(set(RELIABLE_KEYWORDS_RE.findall(text_lower)))
         
         # Adjust confidence based on content analysis
         if misinfo_count > reliable_count and misinfo_count > 0:
@@ -203,11 +410,11 @@ class TextAnalyzer:
                     confidence_adjustments -= 0.1  # Lower confidence in misinfo prediction
         
         # Text quality factors
-        if len(words) < 5:  # Very short text
+        if word_count < 5:  # Very short text
             confidence_adjustments -= 0.1
         
         # Excessive punctuation or caps
-        caps_ratio = sum(1 for c in text if c.isupper()) / len(text) if text else 0
+        caps_ratio = _count_uppercase(text) / len(text) if text else 0
         if caps_ratio > 0.3:  # More than 30% caps
             if predicted_class == 1:  # Predicted misinformation
                 confidence_adjustments += 0.1
@@ -236,10 +443,7 @@ class TextAnalyzer:
             "probabilities": {
                 "reliable": float(final_probabilities["reliable"]),
                 "misinformation": float(final_probabilities["misinformation"])
-            },
-            "language": detected_language,
-            "explanation": self._generate_explanation(text, self.id2label[predicted_class], final_confidence),
-            "model_used": self.model_name
+            }
         }
 
     def _generate_explanation(self, text: str, prediction: str, confidence: float) -> str:
@@ -259,6 +463,14 @@ class TextAnalyzer:
             else:
                 return "Low confidence assessment - text may need further verification."
 
+    def _raw_probs(self, texts: List[str]) -> np.ndarray:
+        """Raw model probability of misinformation for each text, without heuristics"""
+        probabilities = [
+            self._predict([text.strip() for text in texts[start:start + TEXT_BATCH_SIZE]])[0][:, 1]
+            for start in range(0, len(texts), TEXT_BATCH_SIZE)
+        ]
+        return np.concatenate(probabilities) if probabilities else np.empty(0, dtype=np.float32)
+
     def calibrate_model(self, calibration_data: List[Tuple[str, int]]):
         """
         Calibrate the model using Platt scaling
@@ -273,15 +485,11 @@ class TextAnalyzer:
             texts = [item[0] for item in calibration_data]
             labels = [item[1] for item in calibration_data]
 
-            # Get model predictions
-            predictions = []
-            for text in texts:
-                result = self.analyze_text(text)
-                predictions.append(result["probabilities"]["misinformation"])
+            # Get raw model predictions
+            predictions = self._raw_probs(texts)
 
-            # Fit calibrator
-            self.calibrator = CalibratedClassifierCV(cv='prefit')
-            self.calibrator.fit(np.array(predictions).reshape(-1, 1), labels)
+            # Fit calibrator: (a, b) of the Platt sigmoid
+            self.calibrator = fit_platt_scaling(predictions, labels)
 
             logger.info("Model calibration completed")
 
@@ -290,10 +498,44 @@ class TextAnalyzer:
             self.calibrator = None
 
     def batch_analyze(self, texts: List[str]) -> List[Dict[str, Any]]:
-        """Analyze multiple texts in batch"""
-        return [self.analyze_text(text) for text in texts]
-
+        """Analyze multiple texts in batch, with one forward pass per TEXT_BATCH_SIZE texts"""
+        results = []
+        for start in range(0, len(texts), TEXT_BATCH_SIZE):
+            chunk = texts[start:start + TEXT_BATCH_SIZE]
+            try:
+                languages = [detect_language(text) for text in chunk]
+                probabilities, predicted_classes = self._predict(
+                    [self._preprocess_text(text, language) for text, language in zip(chunk, languages)]
+                )
+            except Exception as e:
+                # Fall back to one text at a time so a bad input only fails itself
+                logger.error(f"Error in batch text analysis: {e}")
+                results.extend(self.analyze_text(text) for text in chunk)
+                continue
+
+            # One conversion per batch instead of a numpy scalar per value
+            for text, language, row, predicted_class in zip(chunk, languages, probabilities.tolist(),
+                                                           predicted_classes.tolist()):
+                try:
+                    results.append(self._build_result(text, row, predicted_class, language))
+                except Exception as e:
+                    logger.error(f"Error analyzing text: {e}")
+                    results.append(self._error_result(text, e))
+
+        logger.info(f"Batch text analysis completed for {len(texts)} texts")
+        return results
+
+
+@lru_cache(maxsize=1)
+def get_text_analyzer() -> TextAnalyzer:
+    """Return the global text analyzer, loading its model on first call"""
+    return TextAnalyzer()
+
+
+def __getattr__(name):
+    """Create the global text analyzer instance on first access"""
+    if name == "text_analyzer":
+        return get_text_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Global text analyzer instance
-text_analyzer = TextAnalyzer()
     
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+BK-tree for Hamming-distance lookups over integer hashes
+"""
+from typing import List, Tuple
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two integer hashes"""
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """BK-tree finding integers within a Hamming distance without a full scan"""
+
+    def __init__(self):
+        """Initialize an empty tree"""
+        self.root = None
+        self.size = 0
+
+    def add(self, item: int):
+        """Add an integer to the tree; duplicates are ignored"""
+        if self.root is None:
+            self.root = (item, {})
+            self.size = 1
+            return
+
+        node_item, children = self.root
+        while True:
+            distance = hamming_distance(item, node_item)
+            if distance == 0:
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (item, {})
+                self.size += 1
+                return
+            node_item, children = child
+
+    def find(self, item: int, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Find stored integers within max_distance of item
+
+        Returns:
+            List of (distance, item) tuples, closest first
+        """
+        if self.root is None:
+            return []
+
+        matches = []
+        stack = [self.root]
+        while stack:
+            node_item, children = stack.pop()
+            distance = hamming_distance(item, node_item)
+            if distance <= max_distance:
+                matches.append((distance, node_item))
+            # Triangle inequality: only these subtrees can hold matches
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+
+        matches.sort()
+        return matches
+
+    def __len__(self) -> int:
+        return self.size
@@ -2,11 +2,34 @@
 Language Detection Utilities for MitraVerify
 """
 import logging
-import re
-from typing import Optional
+import string
+from typing import Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Devanagari Unicode block
+DEVANAGARI_FIRST, DEVANAGARI_LAST = 0x0900, 0x097F
+
+# Common Hindi words, romanized or in Devanagari
+HINDI_WORDS = frozenset({
+    'hai', 'nahi', 'kya', 'ho', 'tha', 'thi', 'hota', 'hoti',
+    'नहीं', 'क्या', 'हो', 'था', 'थी', 'होता', 'होती'
+})
+# Punctuation stripped from tokens before the word lookup, including the danda
+TOKEN_PUNCTUATION = string.punctuation + '।'
+
+
+def _count_script_chars(text: str) -> Tuple[int, int]:
+    """Count Devanagari characters and ASCII letters in one vectorized pass over the codepoints"""
+    codepoints = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    hindi_count = np.count_nonzero((codepoints >= DEVANAGARI_FIRST) & (codepoints <= DEVANAGARI_LAST))
+    # Setting bit 0x20 folds A-Z onto a-z without moving any other codepoint into a-z
+    folded = codepoints | 0x20
+    english_count = np.count_nonzero((folded >= ord('a')) & (folded <= ord('z')))
+    return int(hindi_count), int(english_count)
+
 
 def detect_language(text: str) -> str:
     """
@@ -25,11 +48,10 @@ def detect_language(text: str) -> str:
 
     # Simple heuristic-based detection
     # Check for Hindi characters (Devanagari script)
-    hindi_chars = re.findall(r'[\u0900-\u097F]', text)
-    english_chars = re.findall(r'[a-zA-Z]', text)
+    hindi_count, english_count = _count_script_chars(text)
 
-    hindi_ratio = len(hindi_chars) / len(text) if text else 0
-    english_ratio = len(english_chars) / len(text) if text else 0
+    hindi_ratio = hindi_count / len(text) if text else 0
+    english_ratio = english_count / len(text) if text else 0
 
     if hindi_ratio > 0.1:
         return "hi"
@@ -37,10 +59,9 @@ def detect_language(text: str) -> str:
         return "en"
     else:
         # Check for common Hindi words
-        hindi_words = ['hai', 'hai', 'नहीं', 'क्या', 'हो', 'था', 'थी', 'होता', 'होती']
-        for word in hindi_words:
-            if word in text.lower():
-                return "hi"
+        tokens = {token.strip(TOKEN_PUNCTUATION) for token in text.lower().split()}
+        if not HINDI_WORDS.isdisjoint(tokens):
+            return "hi"
 
         return "en"  # Default to English
 
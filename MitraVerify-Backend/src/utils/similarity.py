@@ -0,0 +1,32 @@
+"""
+Similarity scoring over reduced-precision embedding matrices
+"""
+import numpy as np
+
+# Storage dtype of corpus embeddings; half the bytes of float32 per row
+EMBEDDING_DTYPE = np.float16
+# Rows widened to float32 at a time, so the scratch block stays in cache
+SIMILARITY_BLOCK_ROWS = 4096
+
+
+def cosine_similarities(embeddings: np.ndarray, query: np.ndarray,
+                        block_rows: int = SIMILARITY_BLOCK_ROWS) -> np.ndarray:
+    """
+    Dot products of unit-length rows with a unit-length query, as float32
+
+    NumPy has no BLAS GEMV for float16, so the matrix is read in half precision
+    and widened block by block into a small float32 scratch buffer.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    if embeddings.dtype == np.float32:
+        return embeddings @ query
+
+    rows = embeddings.shape[0]
+    scores = np.empty(rows, dtype=np.float32)
+    block = np.empty((min(rows, block_rows), embeddings.shape[1]), dtype=np.float32)
+    for start in range(0, rows, block_rows):
+        chunk = embeddings[start:start + block_rows]
+        widened = block[:len(chunk)]
+        widened[...] = chunk
+        np.dot(widened, query, out=scores[start:start + len(chunk)])
+    return scores
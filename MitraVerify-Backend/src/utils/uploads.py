@@ -0,0 +1,77 @@
+"""
+Upload Handling Utilities for MitraVerify
+"""
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import List
+
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+# Size of each chunk copied from the upload to disk
+UPLOAD_CHUNK_SIZE = 1 << 16
+# Chunks gathered into a single write call
+UPLOAD_WRITE_BATCH = 16
+
+
+def _write_chunks(fd: int, chunks: List[bytes]):
+    """Write all chunks to a file descriptor, in one gather write where supported"""
+    if not hasattr(os, "writev"):
+        for chunk in chunks:
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+        return
+
+    while chunks:
+        written = os.writev(fd, chunks)
+        # Drop fully written chunks and trim a partially written one
+        while chunks and written >= len(chunks[0]):
+            written -= len(chunks.pop(0))
+        if chunks and written:
+            chunks[0] = chunks[0][written:]
+
+
+async def save_upload(file: UploadFile, default_suffix: str = "", head: bytes = b"") -> str:
+    """
+    Stream an uploaded file to a temporary file on disk
+
+    Args:
+        file: Uploaded file
+        default_suffix: Suffix to use when the filename has none
+        head: Bytes already read from the start of the upload
+
+    Returns:
+        Path to the temporary file; the caller must remove it with remove_upload
+    """
+    suffix = Path(file.filename or "").suffix or default_suffix
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    saved = False
+    try:
+        chunks = [head] if head else []
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            chunks.append(chunk)
+            if len(chunks) >= UPLOAD_WRITE_BATCH:
+                _write_chunks(fd, chunks)
+                chunks = []
+        _write_chunks(fd, chunks)
+        saved = True
+    finally:
+        # Also runs on cancellation (client disconnect), which is not an Exception
+        os.close(fd)
+        if not saved:
+            remove_upload(path)
+    return path
+
+
+def remove_upload(path: str):
+    """Remove a temporary upload file, ignoring files that are already gone"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove temporary file {path}: {e}")
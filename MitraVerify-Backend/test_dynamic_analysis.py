@@ -3,14 +3,11 @@
 Real-time Text Analysis Demo
 Shows dynamic confidence scores based on content
 """
-import sys
-import os
+
+from _paths import ensure_src_on_path
 
 # Add the project root and src directory to Python path
-project_root = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(project_root, 'src')
-sys.path.insert(0, project_root)
-sys.path.insert(0, src_dir)
+ensure_src_on_path(include_project_root=True)
 
 def test_dynamic_analysis():
     """Test the enhanced text analyzer with various examples"""
@@ -3,11 +3,12 @@
 Test fusion engine with mocked dependencies
 """
 import sys
-import os
 from unittest.mock import Mock
 
-# Add src directory to path  
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+from _paths import ensure_src_on_path
+
+# Add src directory to path
+ensure_src_on_path()
 
 def create_mock_analyzer():
     """Create a mock analyzer for testing"""
@@ -141,4 +142,4 @@ def main():
     return 0 if passed == len(tests) else 1
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    raise SystemExit(main())
\ No newline at end of file
@@ -3,12 +3,21 @@
 Simple test script for fusion_engine.py
 Tests if the module can be imported and basic functionality works
 """
-import sys
-import os
-from pathlib import Path
+from functools import lru_cache
+
+from _paths import ensure_src_on_path
 
 # Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+ensure_src_on_path()
+
+# Methods a FusionEngine must provide
+REQUIRED_METHODS = frozenset({'analyze_content', '_fuse_results', 'batch_analyze'})
+
+@lru_cache(maxsize=1)
+def _get_engine():
+    """Create one FusionEngine shared by the tests below"""
+    from core.fusion_engine import FusionEngine
+    return FusionEngine()
 
 def test_fusion_engine_import():
     """Test if fusion engine can be imported"""
@@ -28,8 +37,7 @@ def test_fusion_engine_creation():
     """Test if fusion engine can be created"""
     try:
         print("\nTesting fusion engine creation...")
-        from core.fusion_engine import FusionEngine
-        engine = FusionEngine()
+        engine = _get_engine()
         print("✓ Successfully created FusionEngine instance")
         print(f"  - Engine type: {type(engine)}")
         print(f"  - Has text_analyzer: {hasattr(engine, 'text_analyzer')}")
@@ -44,42 +52,46 @@ def test_fusion_methods():
     """Test if fusion engine methods exist"""
     try:
         print("\nTesting fusion engine methods...")
-        from core.fusion_engine import FusionEngine
-        engine = FusionEngine()
+        engine = _get_engine()
         
         # Check if methods exist
-        methods_to_check = ['analyze_content', '_fuse_results', 'batch_analyze']
-        for method in methods_to_check:
-            if hasattr(engine, method):
-                print(f"✓ Method '{method}' exists")
-            else:
+        missing = REQUIRED_METHODS.difference(dir(engine))
+        for method in sorted(REQUIRED_METHODS):
+            if method in missing:
                 print(f"✗ Method '{method}' missing")
-                return False
+            else:
+                print(f"✓ Method '{method}' exists")
         
-        return True
+        return not missing
     except Exception as e:
         print(f"✗ Error testing methods: {e}")
         return False
 
+def _run_safely(test) -> bool:
+    """Run one test, reporting an unexpected exception as a failure"""
+    try:
+        return bool(test())
+    except Exception as e:
+        print(f"✗ Test failed with exception: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("=== Fusion Engine Test Suite ===\n")
     
+    # The other tests need the same import, so stop at once if it fails;
+    # on success they reuse the imported module and the shared engine
+    if not test_fusion_engine_import():
+        print("\n✗ Fusion engine could not be imported; skipping the remaining tests.")
+        return 1
+    
     tests = [
-        test_fusion_engine_import,
         test_fusion_engine_creation,
         test_fusion_methods
     ]
     
-    passed = 0
-    total = len(tests)
-    
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-        except Exception as e:
-            print(f"✗ Test failed with exception: {e}")
+    passed = 1 + sum(1 for test in tests if _run_safely(test))
+    total = len(tests) + 1
     
     print(f"\n=== Test Results ===")
     print(f"Passed: {passed}/{total}")
@@ -92,4 +104,4 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    raise SystemExit(main())
\ No newline at end of file
@@ -2,158 +2,197 @@
 """
 Standalone test for fusion_engine.py functionality
 This test demonstrates the fusion engine working independently of heavy model dependencies
+
+Nothing here relies on docstrings or asserts, so it can run as
+python -OO test_fusion_standalone.py
 """
 import sys
-import os
-import time
-from typing import Dict, Any, Optional
+import re
+import types
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+from _paths import ensure_src_on_path
 
 # Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+ensure_src_on_path()
+
+# Keywords the mock text analyzer treats as strong or weak misinformation signals
+MISINFO_STRONG_RE = re.compile(r"fake|false", re.IGNORECASE)
+MISINFO_WEAK_RE = re.compile(r"breaking|urgent", re.IGNORECASE)
+
+# Canned mock results, built once; analyzers hand out copies since the
+# fusion engine embeds them in its (caller-visible) result
+MISINFO_STRONG_RESULT = {"prediction": "misinformation", "confidence": 0.85, "processing_time": 0.1}
+MISINFO_WEAK_RESULT = {"prediction": "misinformation", "confidence": 0.75, "processing_time": 0.1}
+RELIABLE_TEXT_RESULT = {"prediction": "reliable", "confidence": 0.80, "processing_time": 0.1}
+MANIPULATED_IMAGE_RESULT = {"verdict": "potentially_manipulated", "confidence": 0.78, "processing_time": 0.2}
+AUTHENTIC_IMAGE_RESULT = {"verdict": "authentic", "confidence": 0.82, "processing_time": 0.2}
 
 class MockTextAnalyzer:
     """Mock text analyzer for testing"""
     
     def analyze_text(self, text: str) -> Dict[str, Any]:
-        """Mock text analysis"""
+        # Mock text analysis
         # Simulate different scenarios based on keywords
-        if "fake" in text.lower() or "false" in text.lower():
-            return {
-                "prediction": "misinformation",
-                "confidence": 0.85,
-                "processing_time": 0.1
-            }
-        elif "breaking" in text.lower() or "urgent" in text.lower():
-            return {
-                "prediction": "misinformation", 
-                "confidence": 0.75,
-                "processing_time": 0.1
-            }
+        if MISINFO_STRONG_RE.search(text):
+            return MISINFO_STRONG_RESULT.copy()
+        elif MISINFO_WEAK_RE.search(text):
+            return MISINFO_WEAK_RESULT.copy()
         else:
-            return {
-                "prediction": "reliable",
-                "confidence": 0.80,
-                "processing_time": 0.1
-            }
+            return RELIABLE_TEXT_RESULT.copy()
+    
+    def batch_analyze(self, texts: List[str]) -> List[Dict[str, Any]]:
+        # Mock batched text analysis
+        return [self.analyze_text(text) for text in texts]
+
+@lru_cache(maxsize=1024)
+def normalize_filename(image_path: str) -> str:
+    """Lowercase file name of a path, splitting on both / and \\"""
+    return image_path.rpartition("/")[2].rpartition("\\")[2].lower()
 
 class MockImageAnalyzer:
     """Mock image analyzer for testing"""
     
     def analyze_image(self, image_path: str) -> Dict[str, Any]:
-        """Mock image analysis"""
+        # Mock image analysis
         # Simulate analysis based on filename
-        filename = os.path.basename(image_path).lower()
+        filename = normalize_filename(image_path)
         if "manipulated" in filename or "fake" in filename:
-            return {
-                "verdict": "potentially_manipulated",
-                "confidence": 0.78,
-                "processing_time": 0.2
-            }
+            return MANIPULATED_IMAGE_RESULT.copy()
         else:
-            return {
-                "verdict": "authentic",
-                "confidence": 0.82,
-                "processing_time": 0.2
-            }
+            return AUTHENTIC_IMAGE_RESULT.copy()
+
+# Evidence returned by the mock retriever, by topic keyword, in priority order
+EVIDENCE_TABLE = {
+    "covid": [
+        {
+            "id": "covid_001",
+            "verdict": "false",
+            "confidence": 0.92,
+            "source": "WHO Fact Check",
+            "title": "Debunked COVID-19 claim"
+        }
+    ],
+    "election": [
+        {
+            "id": "election_001",
+            "verdict": "false",
+            "confidence": 0.88,
+            "source": "Election Commission",
+            "title": "Verified election information"
+        }
+    ]
+}
+
+WORD_RE = re.compile(r"[a-z]+")
+
+@lru_cache(maxsize=256)
+def tokenize(text: str) -> frozenset:
+    """Lowercase words in the text, so COVID-19 yields 'covid'"""
+    return frozenset(WORD_RE.findall(text.lower()))
 
 class MockEvidenceRetriever:
     """Mock evidence retriever for testing"""
     
     def retrieve_evidence(self, text: str, top_k: int = 2) -> list:
-        """Mock evidence retrieval"""
+        # Mock evidence retrieval
         # Simulate evidence based on text content
-        if "covid" in text.lower():
-            return [
-                {
-                    "id": "covid_001",
-                    "verdict": "false",
-                    "confidence": 0.92,
-                    "source": "WHO Fact Check",
-                    "title": "Debunked COVID-19 claim"
-                }
-            ]
-        elif "election" in text.lower():
-            return [
-                {
-                    "id": "election_001", 
-                    "verdict": "false",
-                    "confidence": 0.88,
-                    "source": "Election Commission",
-                    "title": "Verified election information"
-                }
-            ]
-        else:
-            return []
+        tokens = tokenize(text)
+        for keyword, evidence in EVIDENCE_TABLE.items():
+            if keyword in tokens:
+                return list(evidence)
+        return []
+
+_mocks_installed = False
+
+def install_mock_modules():
+    """Register stub analyzer modules so importing the fusion engine never loads real models"""
+    global _mocks_installed
+    if _mocks_installed:
+        return
+    mocks = [
+        ("core.text_analyzer", "text_analyzer", MockTextAnalyzer()),
+        ("core.image_analyzer", "image_analyzer", MockImageAnalyzer()),
+        ("core.evidence_retrieval", "evidence_retriever", MockEvidenceRetriever()),
+    ]
+    for module_name, attribute, instance in mocks:
+        module = types.ModuleType(module_name)
+        setattr(module, attribute, instance)
+        sys.modules[module_name] = module
+    _mocks_installed = True
+
+# Test scenarios, built once and read-only
+TEST_CASES = tuple(types.MappingProxyType(case) for case in [
+    {
+        "name": "Text only - Reliable content",
+        "text": "Scientists have published new research on climate change.",
+        "image_path": None
+    },
+    {
+        "name": "Text only - Suspicious content", 
+        "text": "BREAKING: Fake news about election fraud discovered!",
+        "image_path": None
+    },
+    {
+        "name": "Image only - Authentic",
+        "text": None,
+        "image_path": "authentic_photo.jpg"
+    },
+    {
+        "name": "Image only - Suspicious",
+        "text": None, 
+        "image_path": "manipulated_image.jpg"
+    },
+    {
+        "name": "Mixed content - Reliable text + authentic image",
+        "text": "Weather forecast shows sunny skies tomorrow.",
+        "image_path": "weather_photo.jpg"
+    },
+    {
+        "name": "Mixed content - COVID misinformation",
+        "text": "New COVID conspiracy theory spreads online.",
+        "image_path": "covid_chart.jpg" 
+    }
+])
+
+@lru_cache(maxsize=256)
+def analyze_cached(text: Optional[str] = None, image_path: Optional[str] = None) -> Dict[str, Any]:
+    """Analyze content once per distinct (text, image_path) pair"""
+    from core.fusion_engine import fusion_engine
+    return fusion_engine.analyze_content(text=text, image_path=image_path)
 
 def test_fusion_standalone():
     """Test fusion engine as standalone module"""
     try:
         print("=== Standalone Fusion Engine Test ===\n")
         
-        # Import and patch the dependencies with mocks
-        import core.text_analyzer
-        import core.image_analyzer  
-        import core.evidence_retrieval
-        
-        # Replace with mock instances
-        core.text_analyzer.text_analyzer = MockTextAnalyzer()
-        core.image_analyzer.image_analyzer = MockImageAnalyzer()
-        core.evidence_retrieval.evidence_retriever = MockEvidenceRetriever()
+        # Stub out the dependencies before anything imports them
+        install_mock_modules()
         
         # Now import the fusion engine
         from core.fusion_engine import FusionEngine, fusion_engine
         
         print("✓ Successfully imported fusion engine with mocked dependencies\n")
         
-        # Test different scenarios
-        test_cases = [
-            {
-                "name": "Text only - Reliable content",
-                "text": "Scientists have published new research on climate change.",
-                "image_path": None
-            },
-            {
-                "name": "Text only - Suspicious content", 
-                "text": "BREAKING: Fake news about election fraud discovered!",
-                "image_path": None
-            },
-            {
-                "name": "Image only - Authentic",
-                "text": None,
-                "image_path": "authentic_photo.jpg"
-            },
-            {
-                "name": "Image only - Suspicious",
-                "text": None, 
-                "image_path": "manipulated_image.jpg"
-            },
-            {
-                "name": "Mixed content - Reliable text + authentic image",
-                "text": "Weather forecast shows sunny skies tomorrow.",
-                "image_path": "weather_photo.jpg"
-            },
-            {
-                "name": "Mixed content - COVID misinformation",
-                "text": "New COVID conspiracy theory spreads online.",
-                "image_path": "covid_chart.jpg" 
-            }
-        ]
-        
         print("Running test cases:\n")
         
-        for i, case in enumerate(test_cases, 1):
-            print(f"{i}. {case['name']}")
-            
-            result = fusion_engine.analyze_content(
-                text=case['text'],
-                image_path=case['image_path']
+        # Cases are independent, so run them concurrently and report in order
+        with ThreadPoolExecutor(max_workers=len(TEST_CASES)) as executor:
+            case_results = list(executor.map(
+                lambda case: analyze_cached(case['text'], case['image_path']), TEST_CASES
+            ))
+        
+        for i, (case, result) in enumerate(zip(TEST_CASES, case_results), 1):
+            # One write per case rather than one per line
+            sys.stdout.write(
+                f"{i}. {case['name']}\n"
+                f"   Verdict: {result['overall_verdict']}\n"
+                f"   Confidence: {result['confidence']:.3f}\n"
+                f"   Processing time: {result['processing_time']:.3f}s\n"
+                f"   Explanation: {result['explanation'][:100]}...\n\n"
             )
-            
-            print(f"   Verdict: {result['overall_verdict']}")
-            print(f"   Confidence: {result['confidence']:.3f}")
-            print(f"   Processing time: {result['processing_time']:.3f}s")
-            print(f"   Explanation: {result['explanation'][:100]}...")
-            print()
         
         # Test batch analysis
         print("Testing batch analysis...")
@@ -166,14 +205,17 @@ def test_fusion_standalone():
         batch_results = fusion_engine.batch_analyze(batch_contents)
         print(f"✓ Batch analysis completed for {len(batch_results)} items\n")
         
-        print("=== Test Summary ===")
-        print("✓ Fusion engine imports successfully")
-        print("✓ Handles text-only analysis")
-        print("✓ Handles image-only analysis") 
-        print("✓ Handles mixed content analysis")
-        print("✓ Processes different content types appropriately")
-        print("✓ Batch analysis works correctly")
-        print("✓ All fusion logic appears to be working correctly!")
+        sys.stdout.write(
+            "=== Test Summary ===\n"
+            "✓ Fusion engine imports successfully\n"
+            "✓ Handles text-only analysis\n"
+            "✓ Handles image-only analysis\n"
+            "✓ Handles mixed content analysis\n"
+            "✓ Processes different content types appropriately\n"
+            "✓ Batch analysis works correctly\n"
+            "✓ All fusion logic appears to be working correctly!\n"
+        )
+        sys.stdout.flush()
         
         return True
         
@@ -188,21 +230,22 @@ def test_fusion_edge_cases():
     try:
         print("\n=== Edge Case Testing ===\n")
         
-        from core.fusion_engine import fusion_engine
+        # Also needed when this runs on its own, before the standalone test
+        install_mock_modules()
         
         # Test empty inputs
         print("1. Testing empty inputs...")
-        result = fusion_engine.analyze_content()
+        result = analyze_cached(None, None)
         print(f"   Result: {result['overall_verdict']} (confidence: {result['confidence']})")
         
         # Test very short text
         print("2. Testing very short text...")
-        result = fusion_engine.analyze_content(text="Hi")
+        result = analyze_cached("Hi", None)
         print(f"   Result: {result['overall_verdict']} (confidence: {result['confidence']})")
         
         # Test non-existent image path
         print("3. Testing non-existent image...")
-        result = fusion_engine.analyze_content(image_path="nonexistent.jpg")
+        result = analyze_cached(None, "nonexistent.jpg")
         print(f"   Result: {result['overall_verdict']} (confidence: {result['confidence']})")
         
         print("\n✓ Edge case testing completed")
@@ -223,17 +266,19 @@ def main():
         success = False
     
     if success:
-        print("\n🎉 ALL TESTS PASSED! 🎉")
-        print("The fusion_engine.py is working correctly and ready for use.")
-        print("\nNote: The model loading delays you experienced earlier are due to:")
-        print("- PyTorch/Transformers downloading large models")
-        print("- MURIL model initialization")
-        print("- Sentence transformer model loading")
-        print("- This is normal for the first run or when models aren't cached")
+        sys.stdout.write(
+            "\n🎉 ALL TESTS PASSED! 🎉\n"
+            "The fusion_engine.py is working correctly and ready for use.\n"
+            "\nNote: The model loading delays you experienced earlier are due to:\n"
+            "- PyTorch/Transformers downloading large models\n"
+            "- MURIL model initialization\n"
+            "- Sentence transformer model loading\n"
+            "- This is normal for the first run or when models aren't cached\n"
+        )
     else:
         print("\n❌ Some tests failed. Check the errors above.")
     
     return 0 if success else 1
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    raise SystemExit(main())
\ No newline at end of file
@@ -1,38 +1,50 @@
 #!/usr/bin/env python3
 """
 Test script for MitraVerify modules
+
+By default only checks that each module can be found, without running it
+(which would load the models). Pass --deep to actually import them.
 """
 import sys
-import os
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from importlib.util import find_spec
+
+from _paths import ensure_src_on_path
 
 # Add the project root and src directory to Python path
-project_root = os.path.dirname(os.path.abspath(__file__))
-src_dir = os.path.join(project_root, 'src')
-sys.path.insert(0, project_root)
-sys.path.insert(0, src_dir)
-
-try:
-    from src.core.text_analyzer import text_analyzer
-    print("✓ Text analyzer import successful")
-except ImportError as e:
-    print(f"✗ Text analyzer import failed: {e}")
-
-try:
-    from src.core.image_analyzer import image_analyzer
-    print("✓ Image analyzer import successful")
-except ImportError as e:
-    print(f"✗ Image analyzer import failed: {e}")
-
-try:
-    from src.core.evidence_retrieval import evidence_retriever
-    print("✓ Evidence retrieval import successful")
-except ImportError as e:
-    print(f"✗ Evidence retrieval import failed: {e}")
-
-try:
-    from src.api.main import app
-    print("✓ API import successful")
-except ImportError as e:
-    print(f"✗ API import failed: {e}")
-
-print("\nTest completed!")
\ No newline at end of file
+ensure_src_on_path(include_project_root=True)
+
+MODULES = [
+    ("Text analyzer", "src.core.text_analyzer"),
+    ("Image analyzer", "src.core.image_analyzer"),
+    ("Evidence retrieval", "src.core.evidence_retrieval"),
+    ("API", "src.api.main"),
+]
+
+def probe(module_name: str, deep: bool = False):
+    """Return None if the module is importable, else the ImportError"""
+    try:
+        if deep:
+            import_module(module_name)
+        elif find_spec(module_name) is None:
+            return ImportError(f"No module named '{module_name}'")
+    except ImportError as e:
+        return e
+    return None
+
+deep = "--deep" in sys.argv[1:]
+
+# Probes are independent; native extension setup during deep imports overlaps in threads
+with ThreadPoolExecutor(max_workers=len(MODULES)) as executor:
+    errors = list(executor.map(lambda module: probe(module[1], deep), MODULES))
+
+# find_spec only locates a module, so don't report it as imported
+check = "import" if deep else "lookup"
+for (label, module_name), error in zip(MODULES, errors):
+    if error is None:
+        print(f"✓ {label} import successful" if deep else f"✓ {label} found")
+    else:
+        print(f"✗ {label} {check} failed: {error}")
+
+print("\nTest completed!")
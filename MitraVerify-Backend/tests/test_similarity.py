@@ -0,0 +1,37 @@
+"""
+Tests for reduced-precision similarity scoring
+"""
+import numpy as np
+
+from _paths import ensure_src_on_path
+
+ensure_src_on_path()
+
+from utils.similarity import EMBEDDING_DTYPE, cosine_similarities
+
+
+def _unit_rows(rng, rows, dim):
+    matrix = rng.standard_normal((rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_float16_scores_match_float32():
+    rng = np.random.default_rng(0)
+    embeddings = _unit_rows(rng, 1000, 384)
+    query = _unit_rows(rng, 1, 384)[0]
+
+    expected = embeddings @ query
+    # Small blocks so several are widened in turn
+    scores = cosine_similarities(embeddings.astype(EMBEDDING_DTYPE), query, block_rows=64)
+
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, expected, atol=1e-3)
+    assert np.argmax(scores) == np.argmax(expected)
+
+
+def test_float32_matrix_is_scored_directly():
+    rng = np.random.default_rng(1)
+    embeddings = _unit_rows(rng, 10, 16)
+    query = _unit_rows(rng, 1, 16)[0]
+
+    np.testing.assert_allclose(cosine_similarities(embeddings, query), embeddings @ query)